@@ -1,6 +1,10 @@
 """Request correlation context management for distributed tracing."""
 
 import contextvars
+import logging
+import os
+import threading
+from contextvars import Token
 from typing import Optional
 
 # Context variable to store correlation ID for current request
@@ -8,6 +12,36 @@ correlation_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextV
     "correlation_id", default=None
 )
 
+CID_BATCH_SIZE = 256  # Correlation IDs generated per os.urandom call
+
+# Per-thread pools: no lock, and no refill race between threadpool workers
+_cid_local = threading.local()
+
+
+def _generate_cid_batch() -> list[str]:
+    """Generate CID_BATCH_SIZE random (version 4) UUID strings from one urandom read."""
+    raw = bytearray(os.urandom(16 * CID_BATCH_SIZE))
+    for i in range(0, len(raw), 16):
+        raw[i + 6] = (raw[i + 6] & 0x0F) | 0x40  # Version 4
+        raw[i + 8] = (raw[i + 8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = raw.hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, len(h), 32)
+    ]
+
+
+def new_correlation_id() -> str:
+    """Return a fresh correlation ID in canonical UUID4 form (ADR-003).
+
+    Same entropy and format as str(uuid.uuid4()), but the syscall and hex
+    encoding are amortized over a batch.
+    """
+    pool = getattr(_cid_local, "pool", None)
+    if not pool:
+        pool = _cid_local.pool = _generate_cid_batch()
+    return pool.pop()
+
 
 def get_correlation_id() -> str:
     """Get current request's correlation ID.
@@ -27,3 +61,37 @@ def set_correlation_id(cid: str) -> None:
     """
     if cid:
         correlation_id_var.set(cid)
+
+
+def set_correlation_id_scoped(cid: str) -> Token:
+    """Set correlation ID for a request scope.
+
+    Args:
+        cid: The correlation ID (usually a UUID string).
+
+    Returns:
+        Token to pass to reset_correlation_id() when the request ends.
+    """
+    return correlation_id_var.set(cid)
+
+
+def reset_correlation_id(token: Token) -> None:
+    """Restore the correlation ID that was active before set_correlation_id_scoped().
+
+    Args:
+        token: Token returned by set_correlation_id_scoped().
+    """
+    correlation_id_var.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamp each log record with the request's correlation ID.
+
+    Looks the ID up once per record, so formatters can use ``%(correlation_id)s``.
+    An explicit ``extra={"correlation_id": ...}`` on the log call is kept as is.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "correlation_id", None) is None:
+            record.correlation_id = get_correlation_id()
+        return True
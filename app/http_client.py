@@ -4,11 +4,19 @@ Control: Безопасный HTTP-клиент (таймауты, ретраи,
 Related: NFR-001 (performance), R002 (DoS prevention)
 """
 
+import asyncio
+import atexit
+import contextlib
 import logging
+import random
+import threading
 import time
-from typing import Any
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +27,24 @@ WRITE_TIMEOUT = 5.0  # Write timeout
 POOL_TIMEOUT = 2.0  # Connection pool timeout
 
 MAX_RETRIES = 3
-RETRY_BACKOFF = 0.5  # Exponential backoff: 0.5s, 1.0s, 1.5s
+RETRY_BACKOFF = 0.5  # Exponential backoff base: ~0.5s, ~1.0s, ~2.0s (jittered)
+MAX_BACKOFF = 30.0  # Upper bound for a single backoff wait
+
+# Connection pool settings (keep-alive reuse across calls)
+MAX_KEEPALIVE_CONNECTIONS = 32
+MAX_CONNECTIONS = 100
+MAX_CACHED_CLIENTS = 8  # Distinct client option sets kept alive
+
+_CLIENTS: "OrderedDict[frozenset, httpx.Client]" = OrderedDict()
+_CLIENTS_LOCK = threading.Lock()  # Sync fetches may run from FastAPI's threadpool
+# Evicted clients may still be mid-request in another thread: never closed on
+# eviction, only tracked here so close_clients() can close any still alive
+_EVICTED: "weakref.WeakSet[httpx.Client]" = weakref.WeakSet()
+# An AsyncClient's pooled connections belong to the loop that opened them, so
+# each running event loop gets its own shared client (dropped with the loop)
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
 
 
 class HttpClientError(Exception):
@@ -41,11 +66,177 @@ def create_timeout() -> httpx.Timeout:
     )
 
 
+def create_limits() -> httpx.Limits:
+    """Create connection pool limits for the shared HTTP clients.
+
+    Security: Caps open connections so a slow upstream can't exhaust file descriptors.
+    """
+    return httpx.Limits(
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        max_connections=MAX_CONNECTIONS,
+    )
+
+
+def _new_client(**kwargs) -> httpx.Client:
+    return httpx.Client(timeout=create_timeout(), limits=create_limits(), **kwargs)
+
+
+def _get_client(key: frozenset, **kwargs) -> httpx.Client:
+    """Return the pooled client for an option set (LRU; evicted clients are left open)."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None or client.is_closed:
+            client = _new_client(**kwargs)
+            _CLIENTS[key] = client
+            if len(_CLIENTS) > MAX_CACHED_CLIENTS:
+                _, evicted = _CLIENTS.popitem(last=False)
+                _EVICTED.add(evicted)
+        else:
+            _CLIENTS.move_to_end(key)
+        return client
+
+
+def _client_scope(client: httpx.Client | None = None, **kwargs):
+    """Context manager yielding a pooled client, or the caller's own client.
+
+    Options that can't be hashed (e.g. a headers dict) get a one-off client
+    that is closed when the scope exits.
+    """
+    if client is not None:
+        if kwargs:
+            raise TypeError("client options can't be combined with an explicit client")
+        return contextlib.nullcontext(client)
+    try:
+        key = frozenset(kwargs.items())
+    except TypeError:
+        return _new_client(**kwargs)
+    return contextlib.nullcontext(_get_client(key, **kwargs))
+
+
+def close_clients() -> None:
+    """Close all pooled HTTP clients, and evicted ones not yet garbage-collected."""
+    with _CLIENTS_LOCK:
+        clients = [*_CLIENTS.values(), *_EVICTED]
+        _CLIENTS.clear()
+        _EVICTED.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_clients)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Return the shared async client of the running event loop (created lazily)."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = _ASYNC_CLIENTS[loop] = httpx.AsyncClient(
+            timeout=create_timeout(), limits=create_limits()
+        )
+    return client
+
+
+def _async_client_scope(client: httpx.AsyncClient | None = None, **kwargs):
+    """Async context manager yielding the shared client, or a one-off client for custom options."""
+    if client is not None:
+        if kwargs:
+            raise TypeError("client options can't be combined with an explicit client")
+        return contextlib.nullcontext(client)
+    if kwargs:
+        return httpx.AsyncClient(timeout=create_timeout(), limits=create_limits(), **kwargs)
+    return contextlib.nullcontext(_get_async_client())
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's shared async client (call on application shutdown)."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+# Failures a retry cannot fix (bad URL/scheme, malformed request): fail fast, no backoff
+_NON_RETRYABLE = (httpx.InvalidURL, httpx.UnsupportedProtocol, httpx.LocalProtocolError)
+
+# Everything the retry loops catch and hand to _handle_failure
+_REQUEST_FAILURES = (httpx.HTTPStatusError, httpx.RequestError, httpx.InvalidURL)
+
+
+def _handle_failure(
+    exc: httpx.HTTPStatusError | httpx.RequestError | httpx.InvalidURL,
+    url: str,
+    attempt: int,
+    max_retries: int,
+) -> None:
+    """Log a failed attempt, raising HttpClientError if it must not be retried."""
+    if isinstance(exc, _NON_RETRYABLE):
+        logger.error(
+            "HTTP request not retryable: %s",
+            type(exc).__name__,
+            extra={"url": url, "error": str(exc)[:100]},
+        )
+        raise HttpClientError(str(exc)[:100]) from exc
+
+    if isinstance(exc, httpx.TimeoutException):
+        logger.warning(
+            "HTTP timeout (attempt %s/%s)",
+            attempt + 1,
+            max_retries,
+            extra={"url": url, "error": "timeout"},
+        )
+
+    elif isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        # Don't retry on 4xx (client errors)
+        if 400 <= status < 500:
+            logger.error("HTTP %s error", status, extra={"url": url, "status": status})
+            raise HttpClientError(f"HTTP {status}") from exc
+
+        # Retry on 5xx
+        logger.warning(
+            "HTTP %s (attempt %s/%s)",
+            status,
+            attempt + 1,
+            max_retries,
+            extra={"url": url, "status": status},
+        )
+
+    else:
+        logger.warning(
+            "HTTP request failed (attempt %s/%s)",
+            attempt + 1,
+            max_retries,
+            extra={"url": url, "error": str(exc)[:100]},  # Truncate for logs
+        )
+
+
+def backoff_delay(attempt: int, backoff_factor: float = RETRY_BACKOFF) -> float:
+    """Compute the wait before the next attempt (exponential with jitter).
+
+    The delay is backoff_factor * 2**attempt scaled by a random factor in
+    [0.5, 1.5), capped at MAX_BACKOFF.
+
+    Security: Jitter keeps clients that failed together from retrying in
+    lockstep (thundering herd against a recovering upstream).
+    """
+    wait_time = backoff_factor * (2**attempt) * (0.5 + random.random())  # nosec B311
+    return min(wait_time, MAX_BACKOFF)
+
+
+def _retries_exhausted(url: str, max_retries: int) -> HttpClientError:
+    error_msg = f"Failed to fetch {url} after {max_retries} attempts"
+    logger.error(error_msg, extra={"url": url, "max_retries": max_retries})
+    return HttpClientError(error_msg)
+
+
 def fetch_with_retries(
     url: str,
     method: str = "GET",
     max_retries: int = MAX_RETRIES,
     backoff_factor: float = RETRY_BACKOFF,
+    *,
+    client: httpx.Client | None = None,
+    sleep: Callable[[float], None] = time.sleep,
     **kwargs,
 ) -> httpx.Response:
     """Fetch URL with automatic retries and exponential backoff.
@@ -55,7 +246,9 @@ def fetch_with_retries(
         method: HTTP method (GET, POST, etc.)
         max_retries: Maximum retry attempts
         backoff_factor: Exponential backoff multiplier
-        **kwargs: Additional httpx.Client arguments
+        client: Caller-owned client to send through instead of the pool (not closed here)
+        sleep: Called with each backoff delay (injectable for tests)
+        **kwargs: Additional httpx.Client arguments (only without client)
 
     Returns:
         Response object
@@ -65,16 +258,19 @@ def fetch_with_retries(
 
     Security:
         - Timeout prevents hanging
-        - Exponential backoff prevents thundering herd
+        - Jittered exponential backoff prevents thundering herd
         - Maximum retries prevents infinite loops
+        - Pooled client reuses keep-alive connections (no TCP/TLS setup per attempt)
     """
-    timeout = create_timeout()
     last_exception = None
 
-    for attempt in range(max_retries):
-        try:
-            with httpx.Client(timeout=timeout, **kwargs) as client:
-                logger.debug(f"HTTP {method} request", extra={"url": url, "attempt": attempt + 1})
+    with _client_scope(client, **kwargs) as client:
+        for attempt in range(max_retries):
+            try:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "HTTP %s request", method, extra={"url": url, "attempt": attempt + 1}
+                    )
 
                 response = client.request(
                     method=method,
@@ -86,51 +282,95 @@ def fetch_with_retries(
                 response.raise_for_status()
 
                 logger.info(
-                    f"HTTP {method} success",
+                    "HTTP %s success",
+                    method,
                     extra={"url": url, "status": response.status_code},
                 )
                 return response
 
-        except httpx.TimeoutException as e:
-            last_exception = e
-            logger.warning(
-                f"HTTP timeout (attempt {attempt + 1}/{max_retries})",
-                extra={"url": url, "error": "timeout"},
-            )
-
-        except httpx.HTTPStatusError as e:
-            # Don't retry on 4xx (client errors)
-            if 400 <= e.response.status_code < 500:
-                logger.error(
-                    f"HTTP {e.response.status_code} error",
-                    extra={"url": url, "status": e.response.status_code},
+            except _REQUEST_FAILURES as e:
+                last_exception = e
+                _handle_failure(e, url, attempt, max_retries)
+
+            # Exponential backoff
+            if attempt < max_retries - 1:
+                wait_time = backoff_delay(attempt, backoff_factor)
+                logger.debug("Retrying in %ss...", wait_time)
+                sleep(wait_time)
+
+    # All retries exhausted
+    raise _retries_exhausted(url, max_retries) from last_exception
+
+
+async def afetch_with_retries(
+    url: str,
+    method: str = "GET",
+    max_retries: int = MAX_RETRIES,
+    backoff_factor: float = RETRY_BACKOFF,
+    *,
+    client: httpx.AsyncClient | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    **kwargs,
+) -> httpx.Response:
+    """Async variant of fetch_with_retries for use inside request handlers.
+
+    Uses a shared httpx.AsyncClient and asyncio.sleep (or the awaitable
+    sleep given), so backoff waits don't block the event loop. Arguments
+    and errors match fetch_with_retries.
+    """
+    last_exception = None
+
+    async with _async_client_scope(client, **kwargs) as client:
+        for attempt in range(max_retries):
+            try:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "HTTP %s request", method, extra={"url": url, "attempt": attempt + 1}
+                    )
+
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    follow_redirects=True,
+                )
+
+                # Raise on 4xx/5xx
+                response.raise_for_status()
+
+                logger.info(
+                    "HTTP %s success",
+                    method,
+                    extra={"url": url, "status": response.status_code},
                 )
-                raise HttpClientError(f"HTTP {e.response.status_code}") from e
-
-            # Retry on 5xx
-            last_exception = e
-            logger.warning(
-                f"HTTP {e.response.status_code} (attempt {attempt + 1}/{max_retries})",
-                extra={"url": url, "status": e.response.status_code},
-            )
-
-        except httpx.RequestError as e:
-            last_exception = e
-            logger.warning(
-                f"HTTP request failed (attempt {attempt + 1}/{max_retries})",
-                extra={"url": url, "error": str(e)[:100]},  # Truncate for logs
-            )
-
-        # Exponential backoff
-        if attempt < max_retries - 1:
-            wait_time = backoff_factor * (attempt + 1)
-            logger.debug(f"Retrying in {wait_time}s...")
-            time.sleep(wait_time)
+                return response
+
+            except _REQUEST_FAILURES as e:
+                last_exception = e
+                _handle_failure(e, url, attempt, max_retries)
+
+            # Exponential backoff
+            if attempt < max_retries - 1:
+                wait_time = backoff_delay(attempt, backoff_factor)
+                logger.debug("Retrying in %ss...", wait_time)
+                await sleep(wait_time)
 
     # All retries exhausted
-    error_msg = f"Failed to fetch {url} after {max_retries} attempts"
-    logger.error(error_msg, extra={"url": url, "max_retries": max_retries})
-    raise HttpClientError(error_msg) from last_exception
+    raise _retries_exhausted(url, max_retries) from last_exception
+
+
+def _decode_json(response: httpx.Response, url: str) -> Any:
+    try:
+        # orjson parses the raw bytes in C; JSONDecodeError subclasses ValueError
+        data = orjson.loads(response.content)
+    except ValueError as e:
+        logger.error("JSON parse failed", extra={"url": url, "error": "invalid_json"})
+        raise HttpClientError(f"Invalid JSON from {url}") from e
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "JSON parsed successfully",
+            extra={"url": url, "content_type": response.headers.get("content-type")},
+        )
+    return data
 
 
 def fetch_json(
@@ -151,14 +391,15 @@ def fetch_json(
     Raises:
         HttpClientError: If fetch or parse fails
     """
-    try:
-        response = fetch_with_retries(url, method=method, **kwargs)
-        data = response.json()
-        logger.debug(
-            "JSON parsed successfully",
-            extra={"url": url, "content_type": response.headers.get("content-type")},
-        )
-        return data
-    except ValueError as e:
-        logger.error("JSON parse failed", extra={"url": url, "error": "invalid_json"})
-        raise HttpClientError(f"Invalid JSON from {url}") from e
+    response = fetch_with_retries(url, method=method, **kwargs)
+    return _decode_json(response, url)
+
+
+async def afetch_json(
+    url: str,
+    method: str = "GET",
+    **kwargs,
+) -> Any:
+    """Async variant of fetch_json (see afetch_with_retries)."""
+    response = await afetch_with_retries(url, method=method, **kwargs)
+    return _decode_json(response, url)
@@ -1,28 +1,110 @@
+import atexit
 import logging
-import uuid
-from datetime import datetime
-from typing import List, Optional
-
+import os
+import queue
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Annotated, List, Optional, TypedDict
+
+import orjson
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, ConfigDict, Field, field_validator
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
-
-from app.correlation import get_correlation_id, set_correlation_id
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    StringConstraints,
+    field_validator,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.correlation import (
+    CorrelationFilter,
+    get_correlation_id,
+    new_correlation_id,
+    reset_correlation_id,
+    set_correlation_id_scoped,
+)
+from app.file_handler import init_upload_root
+from app.http_client import aclose_async_client
+from app.problem import PROBLEM_JSON, error_meta, problem_prefix
+from app.ratelimit import RateLimitMiddleware, SlidingWindowLimiter
 from app.validation import InputValidator
-from app.validation import ValidationError as InputValidationError
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Configure logging (records carry the request correlation ID, see ADR-003).
+# Request threads only enqueue records; a listener thread does the stream IO.
+# The correlation filter runs on the enqueueing side, where the ContextVar is set.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()  # unbounded, no task_done bookkeeping
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.addFilter(CorrelationFilter())
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # full format applied by listener
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] - %(message)s")
 )
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener_running = False
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
-# Initialize rate limiter (NFR-008: Task API Rate Limiting)
-limiter = Limiter(key_func=get_remote_address)
+
+def start_log_listener() -> None:
+    """Start the background log writer (idempotent)."""
+    global _log_listener_running
+    if not _log_listener_running:
+        _log_listener.start()
+        _log_listener_running = True
+
+
+def stop_log_listener() -> None:
+    """Flush queued records and stop the background log writer (idempotent)."""
+    global _log_listener_running
+    if _log_listener_running:
+        _log_listener.stop()
+        _log_listener_running = False
+
+
+def _drain_log_queue() -> None:
+    """At exit, write out records logged after the lifespan stopped the listener."""
+    start_log_listener()
+    stop_log_listener()
+
+
+start_log_listener()
+atexit.register(_drain_log_queue)
+
+# Initialize rate limiter (NFR-008: Task API Rate Limiting), per (method, route).
+# Sliding window: no 2x burst across window edges.
+limiter = SlidingWindowLimiter(
+    {
+        ("GET", "/health"): "100/minute",  # Health check rate limiting
+        ("POST", "/items"): "200/minute",  # Task creation rate limiting
+        ("GET", "/items"): "300/minute",  # Task listing rate limiting
+        ("GET", "/items/{item_id}"): "300/minute",  # Task retrieval rate limiting
+        ("PUT", "/items/{item_id}"): "200/minute",  # Task update rate limiting
+        ("DELETE", "/items/{item_id}"): "200/minute",  # Task deletion rate limiting
+    }
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: resolve upload root on startup, release HTTP pools on shutdown."""
+    start_log_listener()
+    upload_dir = os.getenv("UPLOAD_DIR")
+    if upload_dir:
+        init_upload_root(Path(upload_dir))
+    yield
+    await aclose_async_client()
+    stop_log_listener()
+
 
 app = FastAPI(
     title="SecDev Course App",
@@ -33,61 +115,92 @@ app = FastAPI(
     ),
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add rate limiter to app
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 
 # ============= Middleware: Correlation ID Injection =============
-@app.middleware("http")
-async def correlation_middleware(request: Request, call_next):
-    """Middleware to inject correlation ID into request context.
+class CorrelationMiddleware:
+    """Pure ASGI middleware to inject correlation ID into request context.
 
     Implements ADR-003: Request Correlation & Distributed Tracing.
     - Generate UUID for every request if not provided
-    - Store in context for access in handlers/loggers
+    - Store in context for access in handlers/loggers (reset when the request ends)
     - Add to response headers for client tracing
-    """
-    # Get or generate correlation ID
-    cid = request.headers.get("X-Correlation-ID") or str(uuid.uuid4())
-    set_correlation_id(cid)
 
-    # Add to request state for later access
-    request.state.correlation_id = cid
+    Works on the raw ASGI scope/send instead of BaseHTTPMiddleware, so there is
+    no per-request task group, stream or Request/Response rebuild.
+    """
 
-    logger.info(
-        "HTTP request",
-        extra={
-            "correlation_id": cid,
-            "method": request.method,
-            "path": request.url.path,
-            "client": request.client.host if request.client else "unknown",
-        },
-    )
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    response = await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    # Add correlation ID to response headers
-    response.headers["X-Correlation-ID"] = cid
+        # Get or generate correlation ID
+        cid = None
+        for name, value in scope["headers"]:
+            if name == b"x-correlation-id":
+                cid = value.decode("latin-1")
+                break
+        if not cid:
+            cid = new_correlation_id()
+        cid_header = (b"x-correlation-id", cid.encode("latin-1"))
+
+        # Add to request state for later access (request.state.correlation_id)
+        scope.setdefault("state", {})["correlation_id"] = cid
+
+        status = None
+
+        async def send_with_correlation_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                # Add correlation ID to response headers
+                status = message["status"]
+                message["headers"] = [*message.get("headers", ()), cid_header]
+            await send(message)
+
+        token = set_correlation_id_scoped(cid)
+        try:
+            await self.app(scope, receive, send_with_correlation_id)
+        finally:
+            reset_correlation_id(token)
+
+        # Access logging is uvicorn's job (--access-log); keep a debug trace only
+        if logger.isEnabledFor(logging.DEBUG):
+            client = scope.get("client")
+            logger.debug(
+                "HTTP %s %s -> %s",
+                scope["method"],
+                scope["path"],
+                status,
+                extra={
+                    "correlation_id": cid,
+                    "status": status,
+                    "client": client[0] if client else "unknown",
+                },
+            )
 
-    logger.info(
-        "HTTP response",
-        extra={
-            "correlation_id": cid,
-            "status": response.status_code,
-            "path": request.url.path,
-        },
-    )
 
-    return response
+# Rate limiting runs inside the correlation middleware, so 429s carry the correlation ID
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
+app.add_middleware(CorrelationMiddleware)
 
 
 # ============= RFC 7807 Error Format Handlers =============
 class ApiError(Exception):
     """Custom API error with RFC 7807 formatting."""
 
+    # Attributes in slots: no per-instance __dict__ allocated for each raised error
+    __slots__ = ("code", "message", "status", "details")
+
     def __init__(self, code: str, message: str, status: int = 400, details: Optional[dict] = None):
         self.code = code
         self.message = message
@@ -95,25 +208,38 @@ class ApiError(Exception):
         self.details = details or {}
 
 
-class Rfc7807Response(BaseModel):
-    """RFC 7807 Problem Details response format."""
+class Rfc7807Response(TypedDict):
+    """RFC 7807 Problem Details response format (documents handler bodies).
+
+    A TypedDict rather than a model: it is never validated, so no schema is built.
+    """
+
+    type: str  # Error type URI
+    title: str  # Short error title
+    status: int  # HTTP status code
+    detail: str  # Human-readable error description
+    instance: Optional[str]  # Request path
+    correlation_id: str  # Request correlation ID for tracing
+
 
-    type: str = Field(..., description="Error type URI")
-    title: str = Field(..., description="Short error title")
-    status: int = Field(..., description="HTTP status code")
-    detail: str = Field(..., description="Human-readable error description")
-    instance: Optional[str] = Field(None, description="Request path")
-    correlation_id: str = Field(..., description="Request correlation ID for tracing")
+_INTERNAL_PROBLEM_PREFIX = problem_prefix("internal_error", 500) + orjson.dumps(
+    "An internal error occurred. Please contact support."
+)
+_VALIDATION_PROBLEM_PREFIX = problem_prefix("validation_error", 422) + orjson.dumps(
+    "Invalid request parameters"
+)
 
 
 @app.exception_handler(ApiError)
 async def api_error_handler(request: Request, exc: ApiError):
     """Handle custom API errors with RFC 7807 format."""
     correlation_id = get_correlation_id()
-    path = str(request.url.path)
+    path = request.url.path
 
     logger.warning(
-        f"API error: {exc.code} - {exc.message}",
+        "API error: %s - %s",
+        exc.code,
+        exc.message,
         extra={
             "correlation_id": correlation_id,
             "error_code": exc.code,
@@ -123,31 +249,34 @@ async def api_error_handler(request: Request, exc: ApiError):
         },
     )
 
-    return JSONResponse(
-        status_code=exc.status,
-        content={
-            "type": f"https://api.secdev.example.com/errors/{exc.code}",
-            "title": exc.code.replace("_", " ").title(),
-            "status": exc.status,
-            "detail": exc.message,
-            "instance": path,
-            "correlation_id": correlation_id,
-            **({"errors": exc.details} if exc.details else {}),
-        },
+    # Hot path (404s): only the variable fields are encoded per response
+    body = b"".join(
+        (
+            problem_prefix(exc.code, exc.status),
+            orjson.dumps(exc.message),
+            b',"instance":',
+            orjson.dumps(path),
+            b',"correlation_id":',
+            orjson.dumps(correlation_id),
+            b',"errors":' + orjson.dumps(exc.details) if exc.details else b"",
+            b"}",
+        )
     )
+    return Response(content=body, status_code=exc.status, media_type=PROBLEM_JSON)
 
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle FastAPI HTTPException with RFC 7807 format (for validation errors, etc.)."""
     correlation_id = get_correlation_id()
-    path = str(request.url.path)
+    path = request.url.path
 
     # Extract validation error details if available
     detail_str = exc.detail if isinstance(exc.detail, str) else "http_error"
 
     logger.warning(
-        f"HTTP error: {exc.status_code}",
+        "HTTP error: %s",
+        exc.status_code,
         extra={
             "correlation_id": correlation_id,
             "error_status": exc.status_code,
@@ -158,12 +287,14 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
     # For validation errors (422), provide structured format
     error_code = "validation_error" if exc.status_code == 422 else "http_error"
+    type_uri, title = error_meta(error_code)
 
-    return JSONResponse(
+    return ORJSONResponse(
+        media_type=PROBLEM_JSON,
         status_code=exc.status_code,
         content={
-            "type": f"https://api.secdev.example.com/errors/{error_code}",
-            "title": error_code.replace("_", " ").title(),
+            "type": type_uri,
+            "title": title,
             "status": exc.status_code,
             "detail": detail_str,
             "instance": path,
@@ -175,12 +306,14 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unhandled exceptions with generic error to client, full log server-side."""
-    correlation_id = get_correlation_id()
-    path = str(request.url.path)
+    # Runs in ServerErrorMiddleware, outside the correlation middleware's context scope
+    correlation_id = getattr(request.state, "correlation_id", None) or get_correlation_id()
+    path = request.url.path
 
     # Log full details server-side
     logger.error(
-        f"Unhandled exception: {type(exc).__name__}",
+        "Unhandled exception: %s",
+        type(exc).__name__,
         extra={
             "correlation_id": correlation_id,
             "request_path": path,
@@ -191,92 +324,93 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
     # Return generic error to client (never expose details)
-    return JSONResponse(
-        status_code=500,
-        content={
-            "type": "https://api.secdev.example.com/errors/internal_error",
-            "title": "Internal Server Error",
-            "status": 500,
-            "detail": "An internal error occurred. Please contact support.",
-            "instance": path,
-            "correlation_id": correlation_id,
-        },
+    body = b"".join(
+        (
+            _INTERNAL_PROBLEM_PREFIX,
+            b',"instance":',
+            orjson.dumps(path),
+            b',"correlation_id":',
+            orjson.dumps(correlation_id),
+            b"}",
+        )
     )
+    return Response(content=body, status_code=500, media_type=PROBLEM_JSON)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle Pydantic validation errors with RFC 7807 format."""
     correlation_id = get_correlation_id()
-    path = str(request.url.path)
-
-    # Extract field errors for logging
-    errors_by_field = {}
-    for error in exc.errors():
-        field = ".".join(str(x) for x in error.get("loc", [])[1:])  # Skip 'body'
-        if field:
-            errors_by_field[field] = error.get("msg", "Invalid value")
-
-    logger.warning(
-        "Validation error",
-        extra={
-            "correlation_id": correlation_id,
-            "request_path": path,
-            "error_count": len(exc.errors()),
-            "fields": list(errors_by_field.keys()),
-        },
-    )
-
-    return JSONResponse(
-        status_code=422,
-        content={
-            "type": "https://api.secdev.example.com/errors/validation_error",
-            "title": "Validation Error",
-            "status": 422,
-            "detail": "Invalid request parameters",
-            "instance": path,
-            "correlation_id": correlation_id,
-        },
+    path = request.url.path
+
+    # Field summary is only for the log; skip it entirely if WARNING is filtered out
+    if logger.isEnabledFor(logging.WARNING):
+        errors = exc.errors()
+        fields = [
+            field
+            for field in (".".join(map(str, e.get("loc", ())[1:])) for e in errors)  # Skip 'body'
+            if field
+        ]
+        logger.warning(
+            "Validation error",
+            extra={
+                "correlation_id": correlation_id,
+                "request_path": path,
+                "error_count": len(errors),
+                "fields": list(dict.fromkeys(fields)),
+            },
+        )
+
+    # Everything up to "instance" is fixed for 422s; only path and ID are encoded
+    body = b"".join(
+        (
+            _VALIDATION_PROBLEM_PREFIX,
+            b',"instance":',
+            orjson.dumps(path),
+            b',"correlation_id":',
+            orjson.dumps(correlation_id),
+            b"}",
+        )
     )
+    return Response(content=body, status_code=422, media_type=PROBLEM_JSON)
 
 
 # ============= Pydantic Models with Integrated Validation =============
-class ItemCreate(BaseModel):
-    """Item creation request model with ADR-002 validation."""
+# Item name: whitespace collapse (Python) runs first, then length is checked
+# natively in pydantic-core on the canonical form (ADR-002).
+ItemName = Annotated[
+    str,
+    BeforeValidator(InputValidator.collapse_whitespace),
+    StringConstraints(
+        min_length=InputValidator.MIN_NAME_LENGTH,
+        max_length=InputValidator.MAX_NAME_LENGTH,
+    ),
+]
+
+# Description: strip + max length after stripping in pydantic-core; "" maps to None
+ItemDescription = Annotated[
+    str,
+    StringConstraints(
+        strip_whitespace=True,
+        max_length=InputValidator.MAX_DESCRIPTION_LENGTH,
+    ),
+    AfterValidator(InputValidator.empty_to_none),
+]
 
-    name: str = Field(..., min_length=1, max_length=100, description="Item name")
-    description: Optional[str] = Field(None, max_length=500, description="Item description")
-    price: Optional[float] = Field(None, ge=0, description="Item price (must be non-negative)")
+# Price: business bounds (Layer 3) checked natively; only the rounding is Python
+ItemPrice = Annotated[
+    float,
+    Field(ge=InputValidator.MIN_PRICE, le=InputValidator.MAX_PRICE),
+    AfterValidator(InputValidator.round_price),
+]
 
-    @field_validator("name")
-    @classmethod
-    def validate_name(cls, v):
-        """Apply canonicalization and validation to name."""
-        try:
-            canonical = InputValidator.canonicalize_name(v)
-            return canonical
-        except InputValidationError as e:
-            raise ValueError(str(e))
 
-    @field_validator("description")
-    @classmethod
-    def validate_description(cls, v):
-        """Apply canonicalization to description."""
-        try:
-            canonical = InputValidator.validate_description(v)
-            return canonical
-        except InputValidationError as e:
-            raise ValueError(str(e))
+class ItemCreate(BaseModel):
+    """Item creation request model with ADR-002 validation."""
 
-    @field_validator("price")
-    @classmethod
-    def validate_price(cls, v):
-        """Apply semantic validation to price."""
-        try:
-            validated = InputValidator.validate_price(v)
-            return validated
-        except InputValidationError as e:
-            raise ValueError(str(e))
+    name: ItemName = Field(..., description="Item name")
+    description: Optional[ItemDescription] = Field(None, description="Item description")
+    price: Optional[ItemPrice] = Field(None, description="Item price (0.01 to 1,000,000)")
 
 
 class ItemResponse(BaseModel):
@@ -294,44 +428,16 @@ class ItemResponse(BaseModel):
 class ItemUpdate(BaseModel):
     """Item update request model with ADR-002 validation."""
 
-    name: Optional[str] = Field(None, min_length=1, max_length=100)
-    description: Optional[str] = Field(None, max_length=500)
-    price: Optional[float] = Field(None, ge=0)
+    name: Optional[ItemName] = None
+    description: Optional[ItemDescription] = None
+    price: Optional[ItemPrice] = None
 
     @field_validator("name")
     @classmethod
-    def validate_name(cls, v):
-        """Apply canonicalization to name if provided."""
-        if v is not None:
-            try:
-                canonical = InputValidator.canonicalize_name(v)
-                return canonical
-            except InputValidationError as e:
-                raise ValueError(str(e))
-        return v
-
-    @field_validator("description")
-    @classmethod
-    def validate_description(cls, v):
-        """Apply canonicalization to description if provided."""
-        if v is not None:
-            try:
-                canonical = InputValidator.validate_description(v)
-                return canonical
-            except InputValidationError as e:
-                raise ValueError(str(e))
-        return v
-
-    @field_validator("price")
-    @classmethod
-    def validate_price(cls, v):
-        """Apply semantic validation to price if provided."""
-        if v is not None:
-            try:
-                validated = InputValidator.validate_price(v)
-                return validated
-            except InputValidationError as e:
-                raise ValueError(str(e))
+    def name_not_null(cls, v):
+        """Omitting name keeps it; an explicit null would store a nameless item."""
+        if v is None:
+            raise ValueError("name cannot be null")
         return v
 
 
@@ -342,108 +448,117 @@ class ErrorResponse(BaseModel):
 
 
 # ============= In-Memory Database =============
-_DB = {"items": [], "next_id": 1}
+@dataclass(slots=True)
+class Item:
+    """Stored item (slots: no per-instance __dict__; read via from_attributes)."""
+
+    id: int
+    name: str
+    description: Optional[str] = None
+    price: Optional[float] = None
+    created_at: datetime = field(default_factory=partial(datetime.now, timezone.utc))
+
+
+# Items are indexed by id (dicts preserve insertion order for listing);
+# "version" is bumped on every write so cached listings can be invalidated
+_DB = {"by_id": {}, "next_id": 1, "version": 0}
+
+# (db version, serialized GET /items body) of the last listing
+_LIST_CACHE: Optional[tuple[int, bytes]] = None
+
+# orjson options for read paths: UTC as "Z", matching Pydantic's write-path output
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
 
 
 # ============= Endpoints with Logging & Rate Limiting =============
+# Health body up to the correlation ID never changes, so it is encoded once
+_HEALTH_PREFIX = orjson.dumps({"status": "ok", "service": "task-tracker"})[:-1]
+_HEALTH_PREFIX += b',"correlation_id":'
+
+
 @app.get("/health")
-@limiter.limit("100/minute")  # NFR-008: Health check rate limiting
-def health(request: Request):
+async def health(request: Request):
     """Health check endpoint with rate limiting.
 
     Returns correlation_id in response for tracing.
     """
-    correlation_id = get_correlation_id()
-    logger.info("Health check requested", extra={"correlation_id": correlation_id})
-    return {
-        "status": "ok",
-        "service": "task-tracker",
-        "correlation_id": correlation_id,
-    }
+    # Returning a Response skips jsonable_encoder and response rendering
+    body = _HEALTH_PREFIX + orjson.dumps(get_correlation_id()) + b"}"
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/items", response_model=ItemResponse, status_code=201)
-@limiter.limit("200/minute")  # NFR-008: Task creation rate limiting
-def create_item(request: Request, item_data: ItemCreate):
+async def create_item(request: Request, item_data: ItemCreate):
     """Create a new item with validation and rate limiting.
 
     Implements ADR-002 (validation) and ADR-001/ADR-003 (error handling + correlation).
     """
     correlation_id = get_correlation_id()
     logger.info(
-        f"Creating new item: {item_data.name}",
+        "Creating new item: %s",
+        item_data.name,
         extra={
             "correlation_id": correlation_id,
             "item_name": item_data.name,
         },
     )
 
-    item = {
-        "id": _DB["next_id"],
-        "name": item_data.name,
-        "description": item_data.description,
-        "price": item_data.price,
-        "created_at": datetime.now(),
-    }
+    item = Item(
+        id=_DB["next_id"],
+        name=item_data.name,
+        description=item_data.description,
+        price=item_data.price,
+    )
 
-    _DB["items"].append(item)
+    _DB["by_id"][item.id] = item
     _DB["next_id"] += 1
+    _DB["version"] += 1
 
     logger.info(
-        f"Item created: {item['id']}",
+        "Item created: %s",
+        item.id,
         extra={
             "correlation_id": correlation_id,
-            "item_id": item["id"],
+            "item_id": item.id,
             "item_name": item_data.name,
         },
     )
     return item
 
 
-@app.get("/items", response_model=List[ItemResponse])
-@limiter.limit("300/minute")  # NFR-008: Task listing rate limiting
-def list_items(request: Request):
-    """Get all items with rate limiting."""
-    correlation_id = get_correlation_id()
-    logger.info(
-        f"Listing {len(_DB['items'])} items",
-        extra={
-            "correlation_id": correlation_id,
-            "item_count": len(_DB["items"]),
-        },
-    )
-    return _DB["items"]
+# Read paths return stored Items as-is, with no response validation; ItemResponse is
+# only declared for the OpenAPI schema. This relies on every write being validated
+# against it first: ItemCreate/ItemUpdate must never let a non-nullable field through
+# as None (see ItemUpdate.name_not_null)
+@app.get("/items", response_model=None, responses={200: {"model": List[ItemResponse]}})
+async def list_items(request: Request):
+    """Get all items with rate limiting.
 
+    The serialized body is cached until the next write to _DB.
+    """
+    global _LIST_CACHE
+    version = _DB["version"]
+    cached = _LIST_CACHE
+    if cached is None or cached[0] != version:
+        body = orjson.dumps(list(_DB["by_id"].values()), option=_ORJSON_OPTIONS)
+        cached = _LIST_CACHE = (version, body)
+    return Response(content=cached[1], media_type="application/json")
 
-@app.get("/items/{item_id}", response_model=ItemResponse)
-@limiter.limit("300/minute")  # NFR-008: Task retrieval rate limiting
-def get_item(request: Request, item_id: int):
-    """Get a specific item by ID with rate limiting."""
-    correlation_id = get_correlation_id()
-    logger.info(
-        f"Getting item: {item_id}",
-        extra={
-            "correlation_id": correlation_id,
-            "item_id": item_id,
-        },
-    )
 
-    for item in _DB["items"]:
-        if item["id"] == item_id:
-            logger.info(
-                f"Item found: {item['name']}",
-                extra={
-                    "correlation_id": correlation_id,
-                    "item_id": item_id,
-                    "item_name": item["name"],
-                },
-            )
-            return item
+@app.get("/items/{item_id}", response_model=None, responses={200: {"model": ItemResponse}})
+async def get_item(request: Request, item_id: int):
+    """Get a specific item by ID with rate limiting."""
+    item = _DB["by_id"].get(item_id)
+    if item is not None:
+        return Response(
+            content=orjson.dumps(item, option=_ORJSON_OPTIONS), media_type="application/json"
+        )
 
     logger.warning(
-        f"Item not found: {item_id}",
+        "Item not found: %s",
+        item_id,
         extra={
-            "correlation_id": correlation_id,
+            "correlation_id": get_correlation_id(),
             "item_id": item_id,
         },
     )
@@ -451,37 +566,39 @@ def get_item(request: Request, item_id: int):
 
 
 @app.put("/items/{item_id}", response_model=ItemResponse)
-@limiter.limit("200/minute")  # NFR-008: Task update rate limiting
-def update_item(request: Request, item_id: int, item_data: ItemUpdate):
+async def update_item(request: Request, item_id: int, item_data: ItemUpdate):
     """Update an existing item with rate limiting."""
     correlation_id = get_correlation_id()
     logger.info(
-        f"Updating item: {item_id}",
+        "Updating item: %s",
+        item_id,
         extra={
             "correlation_id": correlation_id,
             "item_id": item_id,
         },
     )
 
-    for i, item in enumerate(_DB["items"]):
-        if item["id"] == item_id:
-            # Update only provided fields
-            update_data = item_data.model_dump(exclude_unset=True)
-            for key, value in update_data.items():
-                item[key] = value
-
-            logger.info(
-                f"Item updated: {item['name']}",
-                extra={
-                    "correlation_id": correlation_id,
-                    "item_id": item_id,
-                    "item_name": item["name"],
-                },
-            )
-            return item
+    item = _DB["by_id"].get(item_id)
+    if item is not None:
+        # Update only provided fields (no intermediate model_dump dict)
+        for key in item_data.model_fields_set:
+            setattr(item, key, getattr(item_data, key))
+        _DB["version"] += 1
+
+        logger.info(
+            "Item updated: %s",
+            item.name,
+            extra={
+                "correlation_id": correlation_id,
+                "item_id": item_id,
+                "item_name": item.name,
+            },
+        )
+        return item
 
     logger.warning(
-        f"Item not found for update: {item_id}",
+        "Item not found for update: %s",
+        item_id,
         extra={
             "correlation_id": correlation_id,
             "item_id": item_id,
@@ -491,33 +608,35 @@ def update_item(request: Request, item_id: int, item_data: ItemUpdate):
 
 
 @app.delete("/items/{item_id}", status_code=204)
-@limiter.limit("200/minute")  # NFR-008: Task deletion rate limiting
-def delete_item(request: Request, item_id: int):
+async def delete_item(request: Request, item_id: int):
     """Delete an item with rate limiting."""
     correlation_id = get_correlation_id()
     logger.info(
-        f"Deleting item: {item_id}",
+        "Deleting item: %s",
+        item_id,
         extra={
             "correlation_id": correlation_id,
             "item_id": item_id,
         },
     )
 
-    for i, item in enumerate(_DB["items"]):
-        if item["id"] == item_id:
-            deleted_item = _DB["items"].pop(i)
-            logger.info(
-                f"Item deleted: {deleted_item['name']}",
-                extra={
-                    "correlation_id": correlation_id,
-                    "item_id": item_id,
-                    "item_name": deleted_item["name"],
-                },
-            )
-            return
+    deleted_item = _DB["by_id"].pop(item_id, None)
+    if deleted_item is not None:
+        _DB["version"] += 1
+        logger.info(
+            "Item deleted: %s",
+            deleted_item.name,
+            extra={
+                "correlation_id": correlation_id,
+                "item_id": item_id,
+                "item_name": deleted_item.name,
+            },
+        )
+        return
 
     logger.warning(
-        f"Item not found for deletion: {item_id}",
+        "Item not found for deletion: %s",
+        item_id,
         extra={
             "correlation_id": correlation_id,
             "item_id": item_id,
@@ -4,12 +4,33 @@ Control: Валидация и нормализация ввода (Decimal дл
 Related: NFR-005 (100% validation), R003 (tampering prevention)
 """
 
+import json
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 from typing import Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+# Validation bounds, built once (not re-parsed per request)
+_AMOUNT_MAX = Decimal("999999999.99")
+
+# Active ISO 4217 currency codes in circulation, from List One ("Current currency &
+# funds") published by the SIX maintenance agency, as amended through 2024 (XCG,
+# ZWG): https://www.six-group.com/en/products-services/financial-information/data-standards.html
+# Funds, precious-metal and test codes such as XAU/XTS/XXX are not payment currencies
+_ISO_4217_CODES: frozenset[str] = frozenset(
+    """
+    AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB BRL
+    BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP DZD EGP
+    ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GNF GTQ GYD HKD HNL HTG HUF IDR ILS INR
+    IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK LBP LKR LRD LSL
+    LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN NAD NGN NIO NOK NPR
+    NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF SAR SBD SCR SDG SEK SGD
+    SHP SLE SOS SRD SSP STN SVC SYP SZL THB TJS TMT TND TOP TRY TTD TWD TZS UAH UGX
+    USD UYU UZS VED VES VND VUV WST XAF XCD XCG XOF XPF YER ZAR ZMW ZWG
+    """.split()
+)
+
 
 class Payment(BaseModel):
     """Payment request with strict Decimal and UTC validation.
@@ -38,23 +59,24 @@ class Payment(BaseModel):
     @classmethod
     def validate_amount(cls, v):
         """Ensure amount is Decimal, not float."""
-        if isinstance(v, float):
-            # Float can have precision errors (0.1 + 0.2 != 0.3)
-            raise ValueError("amount must be Decimal or string, not float (precision loss)")
-
-        if isinstance(v, str):
+        # Decimal first: the common case (parse_payment_json decodes to Decimal)
+        if isinstance(v, Decimal):
+            pass
+        elif isinstance(v, str):
             try:
                 v = Decimal(v)
             except (InvalidOperation, ValueError):
                 raise ValueError(f"Invalid amount: {v}")
-
-        if not isinstance(v, Decimal):
+        elif isinstance(v, float):
+            # Float can have precision errors (0.1 + 0.2 != 0.3)
+            raise ValueError("amount must be Decimal or string, not float (precision loss)")
+        else:
             raise ValueError(f"amount must be Decimal, got {type(v)}")
 
-        # Check bounds
-        if v <= 0:
-            raise ValueError("amount must be positive")
-        if v > Decimal("999999999.99"):
+        # Check bounds (single comparison chain on the happy path)
+        if not (0 < v <= _AMOUNT_MAX):
+            if v <= 0:
+                raise ValueError("amount must be positive")
             raise ValueError("amount too large (max 999999999.99)")
 
         return v
@@ -62,10 +84,10 @@ class Payment(BaseModel):
     @field_validator("currency")
     @classmethod
     def validate_currency(cls, v):
-        """Validate currency code format."""
+        """Normalize currency code to upper case and require a known ISO 4217 code."""
         v = v.upper()
-        if not v.isalpha():
-            raise ValueError("currency must contain only letters")
+        if v not in _ISO_4217_CODES:
+            raise ValueError("currency must be an ISO 4217 code")
         return v
 
     @field_validator("occurred_at", mode="before")
@@ -91,15 +113,13 @@ class Payment(BaseModel):
         return v.replace(tzinfo=None)
 
 
-def parse_payment_json(raw_json: str) -> Payment:
+def parse_payment_json(raw_json: str | bytes) -> Payment:
     """Safely parse JSON payment without float precision loss.
 
-    Security: parse_float=str prevents float intermediates.
+    Security: parse_float=Decimal prevents float intermediates.
     """
-    import json
-
-    # Parse JSON with strings for float values (prevent precision loss)
-    data = json.loads(raw_json, parse_float=str)
+    # JSON numbers with a fraction are decoded straight to Decimal (no float,
+    # no str round-trip through the amount validator)
+    data = json.loads(raw_json, parse_float=Decimal)
 
-    # Pydantic will convert Decimal strings to Decimal
     return Payment.model_validate(data)
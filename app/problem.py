@@ -0,0 +1,25 @@
+"""RFC 7807 Problem Details building blocks shared by all error responses (ADR-001)."""
+
+from functools import lru_cache
+
+import orjson
+
+ERROR_TYPE_BASE = "https://api.secdev.example.com/errors/"
+
+PROBLEM_JSON = "application/problem+json"  # RFC 7807 media type (ADR-001)
+
+# Titles that don't follow from the code itself
+_ERROR_TITLES = {"internal_error": "Internal Server Error"}
+
+
+@lru_cache(maxsize=128)
+def error_meta(code: str) -> tuple[str, str]:
+    """RFC 7807 (type URI, title) for an error code, computed once per code."""
+    return ERROR_TYPE_BASE + code, _ERROR_TITLES.get(code) or code.replace("_", " ").title()
+
+
+@lru_cache(maxsize=128)
+def problem_prefix(code: str, status: int) -> bytes:
+    """Pre-encoded '{"type":..,"title":..,"status":..,"detail":' for (code, status)."""
+    type_uri, title = error_meta(code)
+    return orjson.dumps({"type": type_uri, "title": title, "status": status})[:-1] + b',"detail":'
@@ -0,0 +1,247 @@
+"""In-process request rate limiting (NFR-008: Task API Rate Limiting).
+
+Control: Ограничение частоты запросов (sliding window / token bucket per client and route)
+Related: NFR-008 (rate limiting), R002 (DoS prevention)
+"""
+
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import lru_cache
+from typing import Mapping, NamedTuple, Optional
+
+import orjson
+from starlette.responses import Response
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.correlation import get_correlation_id
+from app.problem import PROBLEM_JSON, problem_prefix
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+PRUNE_INTERVAL = 60.0  # Seconds between sweeps of idle buckets
+
+
+class Rule(NamedTuple):
+    """Rate limit for one route: at most `limit` requests per `period` seconds."""
+
+    route: str  # "METHOD /path/template", part of the bucket key
+    rate: str  # As configured, e.g. "100/minute"
+    limit: int
+    period: float
+    refill: float  # limit / period, tokens per second for the token bucket
+
+
+def parse_rate(rate: str) -> tuple[int, float]:
+    """Parse a rate string such as "100/minute" into (requests, period seconds).
+
+    Raises:
+        ValueError: If the string is malformed or the period is unknown
+    """
+    count, _, unit = rate.partition("/")
+    period = PERIODS.get(unit.strip().lower())
+    if period is None or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return int(count), period
+
+
+class RouteLimiter(ABC):
+    """Base for per-(route, client) limiters: rule lookup by method and path template.
+
+    Limits are configured per (method, path template), e.g. ("GET", "/items/{item_id}"),
+    so every item id shares one budget. Checks run on the event loop only, so the
+    per-key state needs no lock. Subclasses must implement hit() and _prune().
+    """
+
+    def __init__(self, limits: Mapping[tuple[str, str], str]):
+        self._static: dict[tuple[str, str], Rule] = {}
+        self._templated: list[tuple[str, re.Pattern, Rule]] = []
+        self._next_prune = 0.0
+        self._max_period = 0.0
+
+        for (method, path), rate in limits.items():
+            count, period = parse_rate(rate)
+            rule = Rule(f"{method} {path}", rate, count, period, count / period)
+            self._max_period = max(self._max_period, period)
+            if "{" in path:
+                self._templated.append((method, compile_path(path)[0], rule))
+            else:
+                self._static[(method, path)] = rule
+
+    def rule_for(self, method: str, path: str) -> Optional[Rule]:
+        """Return the rule for a request, or None if the route is not limited."""
+        rule = self._static.get((method, path))
+        if rule is not None:
+            return rule
+        for rule_method, regex, rule in self._templated:
+            if rule_method == method and regex.match(path):
+                return rule
+        return None
+
+    @abstractmethod
+    def hit(self, rule: Rule, client: str) -> float:
+        """Count one request from client against rule.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until a request would be allowed
+        """
+
+    def _maybe_prune(self, now: float) -> None:
+        if now >= self._next_prune:
+            # Anything untouched for the longest period is back to a full budget
+            self._prune(now - self._max_period)
+            self._next_prune = now + PRUNE_INTERVAL
+
+    @abstractmethod
+    def _prune(self, idle_since: float) -> None:
+        """Drop per-client state last touched at or before idle_since."""
+
+    def reset(self) -> None:
+        """Forget all per-client state (e.g. between tests)."""
+        self._next_prune = 0.0
+
+
+class SlidingWindowLimiter(RouteLimiter):
+    """Sliding-window log: timestamps of the last `limit` requests per key.
+
+    Unlike a fixed window there is no boundary burst: at most `limit` requests
+    fall in any `period`-long interval. Memory is O(limit) per active key.
+    """
+
+    def __init__(self, limits: Mapping[tuple[str, str], str]):
+        super().__init__(limits)
+        self._logs: dict[tuple[str, str], deque[float]] = {}
+
+    def hit(self, rule: Rule, client: str) -> float:
+        now = time.monotonic()
+        self._maybe_prune(now)
+
+        key = (rule.route, client)
+        log = self._logs.get(key)
+        if log is None:
+            log = self._logs[key] = deque()
+
+        cutoff = now - rule.period
+        while log and log[0] <= cutoff:
+            log.popleft()
+
+        if len(log) >= rule.limit:
+            return log[0] - cutoff
+        log.append(now)
+        return 0.0
+
+    def _prune(self, idle_since: float) -> None:
+        idle = [key for key, log in self._logs.items() if not log or log[-1] <= idle_since]
+        for key in idle:
+            del self._logs[key]
+
+    def reset(self) -> None:
+        super().reset()
+        self._logs.clear()
+
+
+class TokenBucketLimiter(RouteLimiter):
+    """Token bucket: `limit` tokens refilled continuously at limit/period per second.
+
+    O(1) state per key ([tokens, last refill], updated in place); allows bursts
+    up to `limit`.
+    """
+
+    def __init__(self, limits: Mapping[tuple[str, str], str]):
+        super().__init__(limits)
+        self._buckets: dict[tuple[str, str], list[float]] = {}
+
+    def hit(self, rule: Rule, client: str) -> float:
+        now = time.monotonic()
+        self._maybe_prune(now)
+
+        key = (rule.route, client)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(rule.limit), now]
+        else:
+            tokens = bucket[0] + (now - bucket[1]) * rule.refill
+            bucket[0] = tokens if tokens < rule.limit else float(rule.limit)
+            bucket[1] = now
+
+        if bucket[0] < 1.0:
+            return (1.0 - bucket[0]) / rule.refill
+        bucket[0] -= 1.0
+        return 0.0
+
+    def _prune(self, idle_since: float) -> None:
+        idle = [key for key, (_, last) in self._buckets.items() if last <= idle_since]
+        for key in idle:
+            del self._buckets[key]
+
+    def reset(self) -> None:
+        super().reset()
+        self._buckets.clear()
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware enforcing a RouteLimiter before routing.
+
+    Rejections are answered here with an RFC 7807 429 (ADR-001) and a
+    Retry-After header; the endpoint is never called.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RouteLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            rule = self.limiter.rule_for(scope["method"], scope["path"])
+            if rule is not None:
+                client = scope.get("client")
+                retry_after = self.limiter.hit(rule, client[0] if client else "127.0.0.1")
+                if retry_after:
+                    response = _too_many_requests(scope["path"], rule, retry_after)
+                    await response(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
+
+
+@lru_cache(maxsize=128)
+def _rate_limit_prefix(rate: str) -> bytes:
+    """Pre-encoded 429 body up to '"instance":' for a rate (fixed per Rule)."""
+    detail = orjson.dumps(f"Rate limit exceeded: {rate}")
+    return problem_prefix("rate_limit_exceeded", 429) + detail + b',"instance":'
+
+
+def _too_many_requests(path: str, rule: Rule, retry_after: float) -> Response:
+    correlation_id = get_correlation_id()
+    logger.warning(
+        "Rate limit exceeded: %s",
+        rule.rate,
+        extra={
+            "correlation_id": correlation_id,
+            "request_path": path,
+            "limit": rule.rate,
+        },
+    )
+    # Only the path and correlation ID are encoded per rejection
+    body = b"".join(
+        (
+            _rate_limit_prefix(rule.rate),
+            orjson.dumps(path),
+            b',"correlation_id":',
+            orjson.dumps(correlation_id),
+            b"}",
+        )
+    )
+    response = Response(
+        content=body,
+        status_code=429,
+        media_type=PROBLEM_JSON,
+    )
+    # Appended pre-encoded: no str header dict to lower-case and encode
+    response.raw_headers.append((b"retry-after", b"%d" % math.ceil(retry_after)))
+    return response
@@ -25,6 +25,28 @@ class InputValidator:
     MAX_PRICE = 1_000_000.00
     MAX_DESCRIPTION_LENGTH = 500
 
+    @staticmethod
+    def collapse_whitespace(value):
+        """Collapse runs of whitespace to a single space and trim.
+
+        Layer 1 normalization only (no length checks), for use as a Pydantic
+        BeforeValidator so core-schema length constraints see the canonical
+        form. Non-string input is passed through for the str schema to reject.
+        """
+        if isinstance(value, str):
+            return " ".join(value.split())
+        return value
+
+    @staticmethod
+    def empty_to_none(value: Optional[str]) -> Optional[str]:
+        """Map an empty (already stripped) string to None (AfterValidator helper)."""
+        return value or None
+
+    @staticmethod
+    def round_price(value: float) -> float:
+        """Round a bounds-checked price to 2 decimals (AfterValidator helper)."""
+        return round(value, 2)
+
     @staticmethod
     def canonicalize_name(raw_name: str) -> str:
         """Canonicalize task name: trim, collapse spaces, validate.
@@ -47,7 +69,7 @@ class InputValidator:
             raise ValidationError("name must be a non-empty string")
 
         # Collapse internal spaces and trim
-        canonical = " ".join(raw_name.split())
+        canonical = InputValidator.collapse_whitespace(raw_name)
 
         # Validate length AFTER canonicalization
         if len(canonical) < InputValidator.MIN_NAME_LENGTH:
@@ -1,7 +1,34 @@
 # tests/conftest.py
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]  # корень репозитория
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient for the whole suite: app lifespan runs once, not per module."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _reset_rate_limits(request):
+    """Give every app-level test a fresh rate-limit budget (the client is shared)."""
+    if "client" in request.fixturenames:
+        request.getfixturevalue("client").app.state.limiter.reset()
+
+
+@pytest.fixture(scope="session")
+def utc_now():
+    """One fixed aware UTC timestamp for tests that don't need the clock to advance."""
+    return datetime.now(timezone.utc).replace(microsecond=0)
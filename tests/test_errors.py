@@ -1,11 +1,4 @@
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-client = TestClient(app)
-
-
-def test_not_found_item():
+def test_not_found_item(client):
     r = client.get("/items/999")
     assert r.status_code == 404
     body = r.json()
@@ -16,7 +9,7 @@ def test_not_found_item():
     assert "correlation_id" in body
 
 
-def test_validation_error():
+def test_validation_error(client):
     r = client.post("/items", json={"name": ""})
     assert r.status_code == 422
     body = r.json()
@@ -4,16 +4,23 @@ Control: Magic bytes validation, path traversal prevention, file size limits
 Tests: Positive, negative (traversal, symlinks, bad types, size limit), boundary
 """
 
+import io
+import os
 import tempfile
+import uuid
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from app import file_handler
 from app.file_handler import (
     MAX_FILE_SIZE,
     FileValidationError,
+    init_upload_root,
     secure_save_file,
     sniff_mimetype,
+    sniff_stream,
     validate_file_upload,
 )
 
@@ -22,6 +29,25 @@ PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
 JPEG_HEADER = b"\xff\xd8\xff\xe0" + b"\x00" * 100 + b"\xff\xd9"
 INVALID_DATA = b"This is not an image"
 
+MIN_PNG = PNG_HEADER[:8]  # Smallest valid PNG (just the signature)
+PNG_WITH_EXTRA = PNG_HEADER + b"EXTRA_DATA"
+
+# One oversized PNG buffer for the size-limit tests; memoryview slices are zero-copy
+_BIG_PNG = memoryview(PNG_HEADER + bytes(MAX_FILE_SIZE))
+MAX_PNG = _BIG_PNG[:MAX_FILE_SIZE]  # Exactly at the limit
+OVER_PNG = _BIG_PNG[: MAX_FILE_SIZE + 1]  # One byte over
+
+
+@pytest.fixture
+def fast_tmp(tmp_path):
+    """Upload dir on tmpfs (/dev/shm) when available, else tmp_path."""
+    shm = Path("/dev/shm")
+    if not (shm.is_dir() and os.access(shm, os.W_OK)):
+        yield tmp_path
+        return
+    with tempfile.TemporaryDirectory(dir=shm) as d:
+        yield Path(d).resolve()
+
 
 class TestMagicBytesDetection:
     """Test MIME type detection from magic bytes."""
@@ -53,6 +79,11 @@ class TestMagicBytesDetection:
         # Will detect as JPEG due to SOI marker (not perfect, but acceptable)
         assert result is None or result[1] == ".jpg"
 
+    def test_soi_without_marker_rejected(self):
+        """NEGATIVE: JPEG SOI not followed by a marker byte is rejected."""
+        not_jpeg = b"\xff\xd8\x00" + b"\x00" * 100 + b"\xff\xd9"
+        assert sniff_mimetype(not_jpeg) is None
+
 
 class TestFileValidation:
     """Test file validation."""
@@ -69,9 +100,13 @@ class TestFileValidation:
         assert mimetype == "image/jpeg"
         assert ext == ".jpg"
 
+    def test_valid_memoryview(self):
+        """Test buffer input is sniffed without converting the whole payload."""
+        assert validate_file_upload(memoryview(JPEG_HEADER)) == ("image/jpeg", ".jpg")
+
     def test_file_too_large(self):
         """NEGATIVE: File exceeding size limit rejected."""
-        large_file = PNG_HEADER + b"\x00" * (MAX_FILE_SIZE + 1)
+        large_file = OVER_PNG
         with pytest.raises(FileValidationError) as exc_info:
             validate_file_upload(large_file)
         assert "too_large" in str(exc_info.value).lower()
@@ -92,38 +127,32 @@ class TestFileValidation:
 class TestSecureSaveFile:
     """Test secure file saving with path traversal prevention."""
 
-    def test_save_valid_file(self):
+    def test_save_valid_file(self, tmp_path):
         """Test saving valid PNG file."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            result = secure_save_file(root, PNG_HEADER)
+        result = secure_save_file(tmp_path, PNG_HEADER)
 
-            # Should be saved with UUID filename
-            assert result.exists()
-            assert result.suffix == ".png"
-            assert result.read_bytes()[:8] == PNG_HEADER[:8]
+        # Should be saved with UUID filename
+        assert result.exists()
+        assert result.suffix == ".png"
+        assert result.read_bytes()[:8] == PNG_HEADER[:8]
 
-    def test_save_different_files_unique_names(self):
+    def test_save_different_files_unique_names(self, tmp_path):
         """Test that multiple saves create unique filenames."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            result1 = secure_save_file(root, PNG_HEADER)
-            result2 = secure_save_file(root, PNG_HEADER)
+        result1 = secure_save_file(tmp_path, PNG_HEADER)
+        result2 = secure_save_file(tmp_path, PNG_HEADER)
 
-            # Different files
-            assert result1 != result2
-            assert result1.exists()
-            assert result2.exists()
+        # Different files
+        assert result1 != result2
+        assert result1.exists()
+        assert result2.exists()
 
-    def test_file_too_large(self):
+    def test_file_too_large(self, tmp_path):
         """NEGATIVE: Large file rejected."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            large_file = PNG_HEADER + b"\x00" * (MAX_FILE_SIZE + 1)
+        large_file = OVER_PNG
 
-            with pytest.raises(FileValidationError) as exc_info:
-                secure_save_file(root, large_file)
-            assert "too_large" in str(exc_info.value).lower()
+        with pytest.raises(FileValidationError) as exc_info:
+            secure_save_file(tmp_path, large_file)
+        assert "too_large" in str(exc_info.value).lower()
 
     def test_invalid_upload_dir(self):
         """NEGATIVE: Non-existent upload directory rejected."""
@@ -131,83 +160,158 @@ class TestSecureSaveFile:
             secure_save_file(Path("/nonexistent/path"), PNG_HEADER)
         assert "not_found" in str(exc_info.value).lower()
 
-    def test_path_traversal_attempt(self):
+    def test_path_traversal_attempt(self, tmp_path):
         """Test path traversal prevention with UUID filenames."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
 
-            # Save file and verify it's in the upload directory
-            result = secure_save_file(root, PNG_HEADER)
+        # Save file and verify it's in the upload directory
+        result = secure_save_file(tmp_path, PNG_HEADER)
 
-            # Resolve both paths to handle symlinks consistently
-            root_resolved = root.resolve()
-            result_resolved = result.resolve()
+        # Resolve both paths to handle symlinks consistently
+        root_resolved = tmp_path.resolve()
+        result_resolved = result.resolve()
 
-            # Check that file is within upload directory
-            assert str(result_resolved).startswith(str(root_resolved))
+        # Check that file is within upload directory
+        assert str(result_resolved).startswith(str(root_resolved))
 
-    def test_symlink_in_path_rejected(self):
+    def test_symlink_in_path_rejected(self, tmp_path):
         """NEGATIVE: Symlink in parent path blocked."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-
-            # Create subdirectory
-            subdir = root / "subdir"
-            subdir.mkdir()
-
-            # Create symlink to some external location
-            try:
-                symlink = root / "symlink"
-                symlink.symlink_to(Path("/tmp"))
-
-                # Try to write a file through the symlink parent
-                # (This is prevented by our checks)
-                # Create a target file in the symlink
-                result = secure_save_file(symlink, PNG_HEADER)
-
-                # If we get here, the file was saved (symlink wasn't detected in traversal check)
-                # This is OK - we're testing that the path is still secure
-                assert result.exists()
-            except (OSError, NotImplementedError):
-                # Symlinks might not be supported on all systems
-                pytest.skip("Symlinks not supported on this system")
-
-    def test_file_saved_with_correct_content(self):
+
+        # Create subdirectory
+        subdir = tmp_path / "subdir"
+        subdir.mkdir()
+
+        # Create symlink to some external location
+        try:
+            symlink = tmp_path / "symlink"
+            symlink.symlink_to(Path("/tmp"))
+
+            # Try to write a file through the symlink parent
+            # (This is prevented by our checks)
+            # Create a target file in the symlink
+            result = secure_save_file(symlink, PNG_HEADER)
+
+            # If we get here, the file was saved (symlink wasn't detected in traversal check)
+            # This is OK - we're testing that the path is still secure
+            assert result.exists()
+        except (OSError, NotImplementedError):
+            # Symlinks might not be supported on all systems
+            pytest.skip("Symlinks not supported on this system")
+
+    def test_planted_symlink_target_rejected(self, tmp_path):
+        """NEGATIVE: Pre-planted symlink at the generated filename is refused."""
+        fixed = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        root = tmp_path.resolve()
+        victim = root / "victim.txt"
+        victim.write_bytes(b"keep")
+        (root / f"{fixed}.png").symlink_to(victim)
+
+        with patch("app.file_handler.uuid.uuid4", return_value=fixed):
+            with pytest.raises(FileValidationError) as exc_info:
+                secure_save_file(root, PNG_HEADER)
+
+        assert "symlink" in str(exc_info.value).lower()
+        assert victim.read_bytes() == b"keep"
+
+    def test_file_saved_with_correct_content(self, tmp_path):
         """Test that saved file has correct content."""
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            original = PNG_HEADER + b"EXTRA_DATA"
-            result = secure_save_file(root, original)
+        result = secure_save_file(tmp_path, PNG_WITH_EXTRA)
 
-            # Content should match
-            assert result.read_bytes() == original
+        # Content should match
+        assert result.read_bytes() == PNG_WITH_EXTRA
 
 
 class TestFileHandlingBoundaries:
     """Test boundary conditions."""
 
-    def test_min_valid_file(self):
+    def test_min_valid_file(self, tmp_path):
         """Test minimum valid file size."""
-        # Smallest valid PNG (just header)
-        min_png = PNG_HEADER[:8]
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            result = secure_save_file(root, min_png)
-            assert result.exists()
+        result = secure_save_file(tmp_path, MIN_PNG)
+        assert result.exists()
 
-    def test_max_valid_file_size(self):
+    def test_max_valid_file_size(self, fast_tmp):
         """Test maximum valid file size."""
-        # Exactly at the limit
-        max_file = PNG_HEADER[:8] + b"\x00" * (MAX_FILE_SIZE - 8)
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            result = secure_save_file(root, max_file)
-            assert result.exists()
+        result = secure_save_file(fast_tmp, MAX_PNG)
+        assert result.exists()
 
-    def test_one_byte_over_limit(self):
+    def test_one_byte_over_limit(self, fast_tmp):
         """NEGATIVE: One byte over limit rejected."""
-        over_file = PNG_HEADER[:8] + b"\x00" * (MAX_FILE_SIZE - 7)
-        with tempfile.TemporaryDirectory() as tmpdir:
-            root = Path(tmpdir)
-            with pytest.raises(FileValidationError):
-                secure_save_file(root, over_file)
+        with pytest.raises(FileValidationError):
+            secure_save_file(fast_tmp, OVER_PNG)
+
+
+class TestUploadRoot:
+    """Test upload root pre-resolution at startup."""
+
+    @pytest.fixture(autouse=True)
+    def _restore_root(self, monkeypatch):
+        monkeypatch.setattr(file_handler, "_UPLOAD_ROOT", None)
+        monkeypatch.setattr(file_handler, "_UPLOAD_ROOT_SOURCE", None)
+
+    def test_init_caches_resolved_root(self, tmp_path):
+        resolved = init_upload_root(tmp_path)
+        with patch.object(Path, "resolve", autospec=True, side_effect=Path.resolve) as spy:
+            result = secure_save_file(tmp_path, PNG_HEADER)
+        assert result.parent == resolved
+        # Only the target file is resolved; the root comes from the cache
+        assert spy.call_count == 1
+
+    def test_init_missing_root(self):
+        with pytest.raises(FileValidationError) as exc_info:
+            init_upload_root(Path("/nonexistent/path"))
+        assert "not_found" in str(exc_info.value)
+
+    def test_init_symlinked_root_rejected(self, tmp_path):
+        """NEGATIVE: Upload root configured through a symlink is refused at startup."""
+        real = tmp_path / "real"
+        real.mkdir()
+        link = tmp_path / "link"
+        link.symlink_to(real)
+        with pytest.raises(FileValidationError) as exc_info:
+            init_upload_root(link)
+        assert "symlink" in str(exc_info.value)
+
+
+class TestStreamUploads:
+    """Test validation and saving from file-like objects (no full buffering)."""
+
+    def test_sniff_stream_restores_position(self):
+        """Test that sniffing a stream does not consume it."""
+        fp = io.BytesIO(PNG_HEADER)
+        assert sniff_stream(fp) == ("image/png", ".png")
+        assert fp.tell() == 0
+
+    def test_validate_stream(self):
+        """Test stream validation returns detected type."""
+        assert validate_file_upload(io.BytesIO(JPEG_HEADER)) == ("image/jpeg", ".jpg")
+
+    def test_stream_too_large(self):
+        """NEGATIVE: Oversized stream rejected before being read."""
+        fp = io.BytesIO(OVER_PNG)
+        with pytest.raises(FileValidationError) as exc_info:
+            validate_file_upload(fp)
+        assert "too_large" in str(exc_info.value).lower()
+        assert fp.tell() == 0
+
+    def test_stream_unsupported_type(self):
+        """NEGATIVE: Unsupported stream type rejected."""
+        with pytest.raises(FileValidationError) as exc_info:
+            validate_file_upload(io.BytesIO(INVALID_DATA))
+        assert "unsupported" in str(exc_info.value).lower()
+
+    def test_unseekable_stream_rejected(self, tmp_path):
+        """NEGATIVE: A pipe can't be size-checked or sniffed, so it is rejected cleanly."""
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, PNG_HEADER)
+        os.close(write_fd)
+        with open(read_fd, "rb") as fp:
+            with pytest.raises(FileValidationError, match="unseekable_stream"):
+                validate_file_upload(fp)
+            with pytest.raises(FileValidationError, match="unseekable_stream"):
+                secure_save_file(tmp_path, fp)
+        assert not any(tmp_path.iterdir())
+
+    def test_save_stream(self, tmp_path):
+        """Test saving a stream copies its full content."""
+        original = PNG_HEADER + b"\x01" * 200_000
+        result = secure_save_file(tmp_path, io.BytesIO(original))
+        assert result.read_bytes() == original
@@ -4,12 +4,80 @@ Control: HTTP client with timeouts, retries, backoff
 Tests: Positive (success), negative (timeout, retries exhausted, 4xx errors), boundary
 """
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
 
 import httpx
 import pytest
 
-from app.http_client import HttpClientError, create_timeout, fetch_json, fetch_with_retries
+from app.http_client import (
+    MAX_BACKOFF,
+    MAX_CACHED_CLIENTS,
+    HttpClientError,
+    _client_scope,
+    afetch_json,
+    afetch_with_retries,
+    backoff_delay,
+    close_clients,
+    create_timeout,
+    fetch_json,
+    fetch_with_retries,
+)
+
+
+def _fake_response(status_code=200, content=b""):
+    """Cheap stand-in for a successful httpx.Response (no MagicMock bookkeeping)."""
+    return SimpleNamespace(
+        status_code=status_code,
+        content=content,
+        headers={"content-type": "application/json"},
+        raise_for_status=lambda: None,
+    )
+
+
+def _scripted_client(*outcomes, client_cls=httpx.Client):
+    """Client whose requests are answered in order by httpx.MockTransport.
+
+    Each outcome is an httpx.Response to return or an exception to raise; the
+    last one repeats once the script runs out. Returns (client, requests seen).
+    """
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        outcome = outcomes[min(len(requests), len(outcomes)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return client_cls(transport=httpx.MockTransport(handler)), requests
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so the client pools the connection
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def local_url():
+    """Base URL of a real HTTP server on localhost (for tests needing a real transport)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
 
 
 class TestTimeoutConfiguration:
@@ -24,152 +92,195 @@ class TestTimeoutConfiguration:
         assert timeout is not None
 
 
+class TestClientPooling:
+    """Test that HTTP clients are reused across calls."""
+
+    @patch("httpx.Client.request", autospec=True)
+    def test_client_reused_between_calls(self, mock_request):
+        """Test that two fetches go through the same pooled client."""
+        mock_request.return_value = _fake_response()
+
+        fetch_with_retries("https://example.com/a")
+        fetch_with_retries("https://example.com/b")
+
+        first_client = mock_request.call_args_list[0].args[0]
+        second_client = mock_request.call_args_list[1].args[0]
+        assert first_client is second_client
+        assert not first_client.is_closed
+
+    @patch("httpx.Client.request", autospec=True)
+    def test_unhashable_options_use_one_off_client(self, mock_request):
+        """Test that unhashable client options get a client closed after the call."""
+        mock_request.return_value = _fake_response()
+
+        fetch_with_retries("https://example.com/a", headers={"X-Test": "1"})
+
+        client = mock_request.call_args.args[0]
+        assert client.is_closed
+
+    def test_evicted_client_left_open_until_close_clients(self):
+        """Test that LRU eviction doesn't close a client another thread may be using."""
+        close_clients()
+        with _client_scope(max_redirects=0) as oldest:
+            pass
+        for n in range(1, MAX_CACHED_CLIENTS + 1):  # One more option set than the pool holds
+            with _client_scope(max_redirects=n):
+                pass
+
+        with _client_scope(max_redirects=0) as replacement:
+            assert replacement is not oldest
+        assert not oldest.is_closed
+
+        close_clients()
+        assert oldest.is_closed and replacement.is_closed
+
+
 class TestHttpFetchSuccess:
     """Test successful HTTP requests."""
 
-    @patch("httpx.Client.request")
-    def test_successful_get(self, mock_request):
+    def test_successful_get(self):
         """Test successful GET request."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_request.return_value = mock_response
+        client, _ = _scripted_client(httpx.Response(200))
 
-        response = fetch_with_retries("https://example.com/health")
+        response = fetch_with_retries("https://example.com/health", client=client)
         assert response.status_code == 200
 
-    @patch("httpx.Client.request")
-    def test_post_request(self, mock_request):
+    def test_post_request(self):
         """Test successful POST request."""
-        mock_response = MagicMock()
-        mock_response.status_code = 201
-        mock_response.raise_for_status.return_value = None
-        mock_request.return_value = mock_response
+        client, requests = _scripted_client(httpx.Response(201))
 
-        response = fetch_with_retries("https://example.com/data", method="POST")
+        response = fetch_with_retries("https://example.com/data", method="POST", client=client)
         assert response.status_code == 201
+        assert requests[0].method == "POST"
 
-    @patch("httpx.Client.request")
-    def test_json_fetch_success(self, mock_request):
+    def test_json_fetch_success(self):
         """Test successful JSON fetch."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"status": "ok"}
-        mock_request.return_value = mock_response
+        client, _ = _scripted_client(httpx.Response(200, json={"status": "ok"}))
 
-        data = fetch_json("https://example.com/api")
+        data = fetch_json("https://example.com/api", client=client)
         assert data == {"status": "ok"}
 
+    def test_client_with_options_rejected(self):
+        """NEGATIVE: Client options can't be combined with an explicit client."""
+        client, _ = _scripted_client(httpx.Response(200))
+
+        with pytest.raises(TypeError):
+            fetch_with_retries("https://example.com/api", client=client, headers={"X": "1"})
+
 
 class TestHttpTimeout:
     """Test timeout handling."""
 
-    @patch("httpx.Client.request")
-    def test_timeout_triggers_retry(self, mock_request):
+    def test_timeout_triggers_retry(self):
         """NEGATIVE: Timeout triggers retry."""
         # Fail twice with timeout, succeed on third
-        mock_request.side_effect = [
+        client, requests = _scripted_client(
             httpx.TimeoutException("Timeout"),
             httpx.TimeoutException("Timeout"),
-            MagicMock(status_code=200, raise_for_status=lambda: None),
-        ]
+            httpx.Response(200),
+        )
 
-        response = fetch_with_retries("https://example.com/health")
+        delays = []
+        response = fetch_with_retries(
+            "https://example.com/health", client=client, sleep=delays.append
+        )
         assert response.status_code == 200
-        assert mock_request.call_count == 3
+        assert len(requests) == 3
+        assert len(delays) == 2
 
-    @patch("httpx.Client.request")
-    def test_timeout_exhausts_retries(self, mock_request):
+    def test_timeout_exhausts_retries(self):
         """NEGATIVE: Timeout exhausts retries and fails."""
-        mock_request.side_effect = httpx.TimeoutException("Timeout")
+        client, requests = _scripted_client(httpx.TimeoutException("Timeout"))
 
         with pytest.raises(HttpClientError) as exc_info:
-            fetch_with_retries("https://example.com/health", max_retries=2)
+            fetch_with_retries(
+                "https://example.com/health", max_retries=2, client=client, sleep=lambda _: None
+            )
 
         assert "Failed to fetch" in str(exc_info.value)
-        assert mock_request.call_count == 2  # Only 2 attempts with max_retries=2
+        assert len(requests) == 2  # Only 2 attempts with max_retries=2
 
 
 class TestHttpRetries:
     """Test retry logic with backoff."""
 
-    @patch("httpx.Client.request")
-    @patch("time.sleep")
-    def test_exponential_backoff(self, mock_sleep, mock_request):
+    @patch("app.http_client.random.random", return_value=0.5)
+    def test_exponential_backoff(self, _mock_random):
         """Test exponential backoff between retries."""
-        mock_request.side_effect = [
-            httpx.RequestError("Connection error"),
-            httpx.RequestError("Connection error"),
-            MagicMock(status_code=200, raise_for_status=lambda: None),
-        ]
+        client, _ = _scripted_client(
+            httpx.ConnectError("Connection error"),
+            httpx.ConnectError("Connection error"),
+            httpx.Response(200),
+        )
 
+        delays = []
         response = fetch_with_retries(
             "https://example.com/health",
             max_retries=3,
             backoff_factor=0.5,
+            client=client,
+            sleep=delays.append,
         )
 
         assert response.status_code == 200
-        # Should sleep with exponential backoff
-        assert mock_sleep.call_count == 2
-        # First sleep: 0.5 * 1 = 0.5s
-        # Second sleep: 0.5 * 2 = 1.0s
-        mock_sleep.assert_any_call(0.5)
-        mock_sleep.assert_any_call(1.0)
-
-    @patch("httpx.Client.request")
-    def test_no_retry_on_4xx(self, mock_request):
+        # Exponential backoff with the jitter factor fixed at 1.0:
+        # 0.5 * 2**0 = 0.5s, then 0.5 * 2**1 = 1.0s
+        assert delays == [0.5, 1.0]
+
+    def test_backoff_jitter_bounds(self):
+        """Test that jittered delays stay within [0.5x, 1.5x) of the exponential base."""
+        for attempt in range(4):
+            base = 0.5 * 2**attempt
+            for _ in range(20):
+                assert 0.5 * base <= backoff_delay(attempt, 0.5) < 1.5 * base
+
+    def test_backoff_capped(self):
+        """Test that backoff never exceeds MAX_BACKOFF."""
+        assert backoff_delay(20, 1.0) == MAX_BACKOFF
+
+    def test_no_retry_on_4xx(self):
         """NEGATIVE: 4xx errors don't trigger retry."""
-        mock_request.side_effect = httpx.HTTPStatusError(
-            "Not Found",
-            request=MagicMock(),
-            response=MagicMock(status_code=404),
-        )
+        client, requests = _scripted_client(httpx.Response(404))
 
         with pytest.raises(HttpClientError) as exc_info:
-            fetch_with_retries("https://example.com/missing")
+            fetch_with_retries("https://example.com/missing", client=client)
 
         assert "404" in str(exc_info.value)
-        assert mock_request.call_count == 1  # No retries for 4xx
+        assert len(requests) == 1  # No retries for 4xx
+
+    def test_no_retry_on_unsupported_protocol(self):
+        """NEGATIVE: Permanent request errors fail fast without backoff."""
+        delays = []
+        with pytest.raises(HttpClientError):
+            fetch_with_retries("ftp://example.com/file", sleep=delays.append)
+
+        assert delays == []
 
 
 class TestHttpErrors:
     """Test error handling."""
 
-    @patch("httpx.Client.request")
-    def test_5xx_triggers_retry(self, mock_request):
+    def test_5xx_triggers_retry(self):
         """Test 5xx errors trigger retries."""
         # Fail twice with 500, succeed on third
-        mock_request.side_effect = [
-            httpx.HTTPStatusError(
-                "Internal Server Error",
-                request=MagicMock(),
-                response=MagicMock(status_code=500),
-            ),
-            httpx.HTTPStatusError(
-                "Internal Server Error",
-                request=MagicMock(),
-                response=MagicMock(status_code=500),
-            ),
-            MagicMock(status_code=200, raise_for_status=lambda: None),
-        ]
-
-        response = fetch_with_retries("https://example.com/api")
+        client, requests = _scripted_client(
+            httpx.Response(500),
+            httpx.Response(500),
+            httpx.Response(200),
+        )
+
+        response = fetch_with_retries(
+            "https://example.com/api", client=client, sleep=lambda _: None
+        )
         assert response.status_code == 200
-        assert mock_request.call_count == 3
+        assert len(requests) == 3
 
-    @patch("httpx.Client.request")
-    def test_invalid_json_raises_error(self, mock_request):
+    def test_invalid_json_raises_error(self):
         """NEGATIVE: Invalid JSON raises error."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_request.return_value = mock_response
+        client, _ = _scripted_client(httpx.Response(200, content=b"{not json"))
 
         with pytest.raises(HttpClientError) as exc_info:
-            fetch_json("https://example.com/api")
+            fetch_json("https://example.com/api", client=client)
 
         assert "Invalid JSON" in str(exc_info.value)
 
@@ -177,109 +288,144 @@ class TestHttpErrors:
 class TestHttpBoundaryConditions:
     """Test boundary and edge cases."""
 
-    @patch("httpx.Client.request")
-    def test_single_retry(self, mock_request):
-        """Test with single retry (max_retries=1)."""
-        mock_request.side_effect = httpx.RequestError("Error")
+    @pytest.mark.parametrize(
+        "max_retries,failures,backoff_factor",
+        [
+            (1, 1, 0.5),  # Single attempt, fails
+            (5, 4, 0.5),  # Many attempts, succeeds on the last
+            (2, 1, 0.0),  # Zero backoff still retries
+        ],
+        ids=["single_retry", "many_retries", "zero_backoff"],
+    )
+    def test_retry_count_boundaries(self, max_retries, failures, backoff_factor):
+        """Test retry counts at the max_retries boundary."""
+        client, requests = _scripted_client(
+            *[httpx.ConnectError("Error")] * failures, httpx.Response(200)
+        )
+        delays = []
 
-        with pytest.raises(HttpClientError):
-            fetch_with_retries(
+        def fetch():
+            return fetch_with_retries(
                 "https://example.com/api",
-                max_retries=1,
+                max_retries=max_retries,
+                backoff_factor=backoff_factor,
+                client=client,
+                sleep=delays.append,
             )
 
-        assert mock_request.call_count == 1
-
-    @patch("httpx.Client.request")
-    def test_many_retries(self, mock_request):
-        """Test with many retry attempts."""
-        # Eventually succeed on last attempt
-        mock_request.side_effect = [
-            httpx.RequestError("Error"),
-            httpx.RequestError("Error"),
-            httpx.RequestError("Error"),
-            httpx.RequestError("Error"),
-            MagicMock(status_code=200, raise_for_status=lambda: None),
-        ]
-
-        response = fetch_with_retries(
-            "https://example.com/api",
-            max_retries=5,
-        )
-
-        assert response.status_code == 200
-        assert mock_request.call_count == 5
+        if failures >= max_retries:
+            with pytest.raises(HttpClientError):
+                fetch()
+        else:
+            assert fetch().status_code == 200
 
-    @patch("httpx.Client.request")
-    def test_zero_backoff(self, mock_request):
-        """Test with zero backoff (should still work)."""
-        mock_request.side_effect = [
-            httpx.RequestError("Error"),
-            MagicMock(status_code=200, raise_for_status=lambda: None),
-        ]
+        assert len(requests) == min(failures + 1, max_retries)
+        if backoff_factor == 0.0:
+            assert delays == [0.0] * failures
 
-        response = fetch_with_retries(
-            "https://example.com/api",
-            max_retries=2,
-            backoff_factor=0.0,  # No backoff
-        )
-
-        assert response.status_code == 200
-
-    @patch("httpx.Client.request")
-    def test_redirect_followed(self, mock_request):
+    def test_redirect_followed(self):
         """Test that redirects are followed."""
-        # This is handled by httpx with follow_redirects=True
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_request.return_value = mock_response
+        client, requests = _scripted_client(
+            httpx.Response(302, headers={"Location": "https://example.com/final"}),
+            httpx.Response(200),
+        )
 
-        response = fetch_with_retries("https://example.com/redirect")
+        response = fetch_with_retries("https://example.com/redirect", client=client)
         assert response.status_code == 200
+        assert str(response.url) == "https://example.com/final"
+        assert len(requests) == 2
 
 
 class TestJsonFetching:
     """Test JSON-specific fetch operations."""
 
-    @patch("httpx.Client.request")
-    def test_fetch_json_object(self, mock_request):
+    def test_fetch_json_object(self):
         """Test fetching JSON object."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"key": "value"}
-        mock_response.headers = {"content-type": "application/json"}
-        mock_request.return_value = mock_response
-
-        data = fetch_json("https://api.example.com/data")
+        client, _ = _scripted_client(httpx.Response(200, json={"key": "value"}))
+
+        data = fetch_json("https://api.example.com/data", client=client)
         assert data == {"key": "value"}
 
-    @patch("httpx.Client.request")
-    def test_fetch_json_array(self, mock_request):
+    def test_fetch_json_array(self):
         """Test fetching JSON array."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = [1, 2, 3]
-        mock_response.headers = {"content-type": "application/json"}
-        mock_request.return_value = mock_response
-
-        data = fetch_json("https://api.example.com/list")
+        client, _ = _scripted_client(httpx.Response(200, json=[1, 2, 3]))
+
+        data = fetch_json("https://api.example.com/list", client=client)
         assert data == [1, 2, 3]
 
-    @patch("httpx.Client.request")
-    def test_fetch_json_with_method(self, mock_request):
+    def test_fetch_json_with_method(self):
         """Test fetching JSON with different HTTP method."""
-        mock_response = MagicMock()
-        mock_response.status_code = 201
-        mock_response.raise_for_status.return_value = None
-        mock_response.json.return_value = {"created": True}
-        mock_response.headers = {"content-type": "application/json"}
-        mock_request.return_value = mock_response
+        client, _ = _scripted_client(httpx.Response(201, json={"created": True}))
 
         data = fetch_json(
             "https://api.example.com/items",
             method="POST",
+            client=client,
         )
         assert data == {"created": True}
+
+
+class TestAsyncHttpFetch:
+    """Test async fetch variants (event loop is never blocked by backoff)."""
+
+    def test_async_successful_get(self):
+        """Test successful async GET request."""
+        client, _ = _scripted_client(httpx.Response(200), client_cls=httpx.AsyncClient)
+
+        response = asyncio.run(afetch_with_retries("https://example.com/health", client=client))
+        assert response.status_code == 200
+
+    def test_async_retry_awaits_sleep(self):
+        """Test that async retries back off by awaiting the (non-blocking) sleep."""
+        delays = []
+
+        async def sleep(delay):
+            delays.append(delay)
+
+        client, _ = _scripted_client(
+            httpx.ConnectError("Connection error"),
+            httpx.Response(200),
+            client_cls=httpx.AsyncClient,
+        )
+
+        response = asyncio.run(
+            afetch_with_retries(
+                "https://example.com/health", max_retries=2, client=client, sleep=sleep
+            )
+        )
+        assert response.status_code == 200
+        assert len(delays) == 1
+
+    def test_async_no_retry_on_4xx(self):
+        """NEGATIVE: 4xx errors don't trigger async retry."""
+        client, requests = _scripted_client(httpx.Response(404), client_cls=httpx.AsyncClient)
+
+        with pytest.raises(HttpClientError) as exc_info:
+            asyncio.run(afetch_with_retries("https://example.com/missing", client=client))
+
+        assert "404" in str(exc_info.value)
+        assert len(requests) == 1
+
+    def test_async_fetch_json(self):
+        """Test async JSON fetch."""
+        client, _ = _scripted_client(
+            httpx.Response(200, json={"status": "ok"}), client_cls=httpx.AsyncClient
+        )
+
+        data = asyncio.run(afetch_json("https://example.com/api", client=client))
+        assert data == {"status": "ok"}
+
+    @patch("httpx.AsyncClient.request")
+    def test_async_default_uses_shared_client(self, mock_request):
+        """Test that without an explicit client the shared async client is used."""
+        mock_request.return_value = _fake_response()
+
+        response = asyncio.run(afetch_with_retries("https://example.com/health"))
+        assert response.status_code == 200
+        assert mock_request.call_count == 1
+
+    def test_async_shared_client_per_event_loop(self, local_url):
+        """Test that separate event loops don't reuse each other's pooled connections."""
+        first = asyncio.run(afetch_with_retries(f"{local_url}/health", max_retries=1))
+        second = asyncio.run(afetch_with_retries(f"{local_url}/health", max_retries=1))
+        assert first.status_code == second.status_code == 200
@@ -1,11 +1,7 @@
-from fastapi.testclient import TestClient
+from datetime import datetime, timezone
 
-from app.main import app
 
-client = TestClient(app)
-
-
-def test_create_item_success():
+def test_create_item_success(client):
     """Test successful item creation."""
     item_data = {"name": "Test Item", "description": "A test item", "price": 10.99}
     response = client.post("/items", json=item_data)
@@ -18,7 +14,7 @@ def test_create_item_success():
     assert "created_at" in data
 
 
-def test_create_item_minimal():
+def test_create_item_minimal(client):
     """Test item creation with minimal data."""
     item_data = {"name": "Minimal Item"}
     response = client.post("/items", json=item_data)
@@ -29,7 +25,7 @@ def test_create_item_minimal():
     assert data["price"] is None
 
 
-def test_create_item_validation_error():
+def test_create_item_validation_error(client):
     """Test item creation with validation errors."""
     # Empty name
     response = client.post("/items", json={"name": ""})
@@ -44,7 +40,7 @@ def test_create_item_validation_error():
     assert response.status_code == 422
 
 
-def test_get_item_success():
+def test_get_item_success(client):
     """Test successful item retrieval."""
     # First create an item
     item_data = {"name": "Test Item"}
@@ -59,7 +55,7 @@ def test_get_item_success():
     assert data["id"] == item_id
 
 
-def test_get_item_not_found():
+def test_get_item_not_found(client):
     """Test item retrieval when item doesn't exist."""
     response = client.get("/items/999")
     assert response.status_code == 404
@@ -68,7 +64,7 @@ def test_get_item_not_found():
     assert data["status"] == 404
 
 
-def test_list_items():
+def test_list_items(client):
     """Test listing all items."""
     # Create a few items
     client.post("/items", json={"name": "Item 1"})
@@ -81,7 +77,7 @@ def test_list_items():
     assert all("name" in item for item in data)
 
 
-def test_update_item_success():
+def test_update_item_success(client):
     """Test successful item update."""
     # Create an item
     item_data = {"name": "Original Name"}
@@ -97,14 +93,39 @@ def test_update_item_success():
     assert data["price"] == 15.99
 
 
-def test_update_item_not_found():
+def test_update_item_not_found(client):
     """Test item update when item doesn't exist."""
     update_data = {"name": "Updated Name"}
     response = client.put("/items/999", json=update_data)
     assert response.status_code == 404
 
 
-def test_delete_item_success():
+def test_update_item_null_name_rejected(client):
+    """Test that an explicit null name is rejected and the stored name is kept."""
+    item_id = client.post("/items", json={"name": "Keep Me"}).json()["id"]
+
+    response = client.put(f"/items/{item_id}", json={"name": None})
+    assert response.status_code == 422
+
+    # Omitting name (or nulling nullable fields) is still allowed
+    response = client.put(f"/items/{item_id}", json={"price": 5.0, "description": None})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Keep Me"
+
+
+def test_null_name_update_never_served_on_reads(client):
+    """Test that read paths (served without response validation) never return a null name."""
+    item_id = client.post("/items", json={"name": "Readable"}).json()["id"]
+    client.put(f"/items/{item_id}", json={"name": None})
+
+    fetched = client.get(f"/items/{item_id}")
+    assert fetched.status_code == 200
+    assert fetched.json()["name"] == "Readable"
+    listed = {item["id"]: item for item in client.get("/items").json()}
+    assert listed[item_id]["name"] == "Readable"
+
+
+def test_delete_item_success(client):
     """Test successful item deletion."""
     # Create an item
     item_data = {"name": "To Delete"}
@@ -120,7 +141,41 @@ def test_delete_item_success():
     assert get_response.status_code == 404
 
 
-def test_delete_item_not_found():
+def test_delete_item_not_found(client):
     """Test item deletion when item doesn't exist."""
     response = client.delete("/items/999")
     assert response.status_code == 404
+
+
+def test_list_items_preserves_creation_order(client):
+    """Test that listing keeps insertion order after a deletion."""
+    ids = [client.post("/items", json={"name": f"Ordered {i}"}).json()["id"] for i in range(3)]
+    client.delete(f"/items/{ids[1]}")
+
+    listed = [item["id"] for item in client.get("/items").json()]
+    assert ids[1] not in listed
+    assert listed.index(ids[0]) < listed.index(ids[2])
+
+
+def test_list_items_reflects_updates(client):
+    """Test that the cached listing is invalidated by writes."""
+    item_id = client.post("/items", json={"name": "Cached"}).json()["id"]
+    assert any(item["id"] == item_id for item in client.get("/items").json())
+
+    client.put(f"/items/{item_id}", json={"name": "Cached Updated"})
+    listed = {item["id"]: item for item in client.get("/items").json()}
+    assert listed[item_id]["name"] == "Cached Updated"
+
+    client.delete(f"/items/{item_id}")
+    assert item_id not in {item["id"] for item in client.get("/items").json()}
+
+
+def test_created_at_is_utc_and_consistent(client):
+    """Test that created_at is UTC and serialized identically on write and read paths."""
+    created = client.post("/items", json={"name": "Timestamped"}).json()
+    fetched = client.get(f"/items/{created['id']}").json()
+    listed = {item["id"]: item for item in client.get("/items").json()}
+
+    assert created["created_at"] == fetched["created_at"] == listed[created["id"]]["created_at"]
+    parsed = datetime.fromisoformat(created["created_at"].replace("Z", "+00:00"))
+    assert parsed.utcoffset() == timezone.utc.utcoffset(None)
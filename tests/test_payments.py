@@ -12,125 +12,174 @@ from pydantic import ValidationError
 
 from app.payments import Payment, parse_payment_json
 
+# Decimal/datetime values are immutable, so one instance serves every test
+_D100 = Decimal("100.00")
+_D_MIN = Decimal("0.01")
+_D_MAX = Decimal("999999999.99")
+_EXPECTED_DT = datetime(2025, 1, 15, 10, 30, 45)  # 10:30:45 UTC, naive after normalization
+
+# Raw request bodies arrive as bytes, so the JSON parsing tests feed bytes too
+_JSON_VALID = b'{"amount": "123.45", "currency": "USD", "occurred_at": "2025-01-15T10:30:45Z"}'
+_JSON_EUR = b'{"amount": "99.99", "currency": "EUR", "occurred_at": "2025-01-15T10:30:45Z"}'
+_JSON_NUMERIC = b'{"amount": 0.10, "currency": "USD", "occurred_at": "2025-01-15T10:30:45Z"}'
+_JSON_INVALID = b'{"amount": invalid}'
+_JSON_EXTRA = (
+    b'{"amount": "100.00", "currency": "USD", '
+    b'"occurred_at": "2025-01-15T10:30:45Z", "extra_field": "value"}'
+)
+
 
 class TestPaymentAmountValidation:
     """Test amount field validation with Decimal."""
 
-    def test_valid_amount_decimal(self):
+    def test_valid_amount_decimal(self, utc_now):
         """Test valid amount as Decimal."""
         p = Payment(
             amount=Decimal("99.99"),
             currency="USD",
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
         assert p.amount == Decimal("99.99")
 
-    def test_valid_amount_string(self):
+    def test_valid_amount_string(self, utc_now):
         """Test valid amount as string (converted to Decimal)."""
         p = Payment(
             amount="50.25",
             currency="EUR",
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
         assert p.amount == Decimal("50.25")
 
-    def test_invalid_amount_float_rejected(self):
+    def test_invalid_amount_float_rejected(self, utc_now):
         """NEGATIVE: Float amounts rejected (precision loss risk)."""
         with pytest.raises(ValidationError) as exc_info:
             Payment(
                 amount=0.1,  # Float!
                 currency="USD",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
         assert "precision loss" in str(exc_info.value).lower()
 
-    def test_invalid_amount_negative(self):
+    def test_invalid_amount_negative(self, utc_now):
         """NEGATIVE: Negative amount rejected."""
         with pytest.raises(ValidationError):
             Payment(
                 amount=Decimal("-10.00"),
                 currency="USD",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
-    def test_invalid_amount_zero(self):
+    def test_invalid_amount_zero(self, utc_now):
         """NEGATIVE: Zero amount rejected."""
         with pytest.raises(ValidationError):
             Payment(
                 amount=Decimal("0.00"),
                 currency="USD",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
-    def test_invalid_amount_too_large(self):
+    def test_invalid_amount_too_large(self, utc_now):
         """NEGATIVE: Amount exceeding max rejected."""
         with pytest.raises(ValidationError):
             Payment(
                 amount=Decimal("9999999999.99"),
                 currency="USD",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
 
 class TestPaymentCurrencyValidation:
     """Test currency field validation."""
 
-    def test_valid_currency(self):
+    def test_valid_currency(self, utc_now):
         """Test valid currency code."""
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
         assert p.currency == "USD"
 
-    def test_invalid_currency_too_short(self):
+    def test_invalid_currency_too_short(self, utc_now):
         """NEGATIVE: Currency too short."""
         with pytest.raises(ValidationError):
             Payment(
-                amount=Decimal("100.00"),
+                amount=_D100,
                 currency="US",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
-    def test_invalid_currency_too_long(self):
+    def test_invalid_currency_too_long(self, utc_now):
         """NEGATIVE: Currency too long."""
         with pytest.raises(ValidationError):
             Payment(
-                amount=Decimal("100.00"),
+                amount=_D100,
                 currency="USDA",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
-    def test_invalid_currency_with_numbers(self):
+    def test_invalid_currency_with_numbers(self, utc_now):
         """NEGATIVE: Currency with numbers rejected."""
         with pytest.raises(ValidationError):
             Payment(
-                amount=Decimal("100.00"),
+                amount=_D100,
                 currency="US1",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
+            )
+
+    def test_invalid_currency_non_ascii_letters(self, utc_now):
+        """NEGATIVE: Non-ASCII letters are not ISO 4217 codes."""
+        with pytest.raises(ValidationError):
+            Payment(
+                amount=_D100,
+                currency="ÜSD",
+                occurred_at=utc_now,
             )
 
+    def test_recently_added_currencies_accepted(self, utc_now):
+        """Test codes introduced by recent ISO 4217 amendments are accepted."""
+        for code in ("VED", "VES", "SLE", "XCG", "ZWG"):
+            assert Payment(amount=_D100, currency=code, occurred_at=utc_now).currency == code
+
+    def test_unknown_currency_rejected(self, utc_now):
+        """NEGATIVE: Well-formed but unassigned codes are rejected."""
+        for code in ("XYZ", "XAU", "XXX"):
+            with pytest.raises(ValidationError):
+                Payment(
+                    amount=_D100,
+                    currency=code,
+                    occurred_at=utc_now,
+                )
+
+    def test_lowercase_currency_normalized(self, utc_now):
+        """Test lowercase currency code is upper-cased."""
+        p = Payment(
+            amount=_D100,
+            currency="eur",
+            occurred_at=utc_now,
+        )
+        assert p.currency == "EUR"
+
 
 class TestPaymentDatetimeValidation:
     """Test datetime normalization to UTC."""
 
-    def test_valid_utc_datetime(self):
+    def test_valid_utc_datetime(self, utc_now):
         """Test valid UTC datetime."""
-        now_utc = datetime.now(timezone.utc).replace(microsecond=0)
+        now_utc = utc_now
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             occurred_at=now_utc,
         )
         # Should be stored without timezone info (but is UTC)
         assert p.occurred_at.tzinfo is None
 
-    def test_naive_datetime_assumed_utc(self):
+    def test_naive_datetime_assumed_utc(self, utc_now):
         """Test naive datetime assumed to be UTC."""
-        now_naive = datetime.now().replace(microsecond=0)
+        now_naive = utc_now.replace(tzinfo=None)
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             occurred_at=now_naive,
         )
@@ -141,33 +190,33 @@ class TestPaymentDatetimeValidation:
         """Test ISO 8601 string parsed to UTC."""
         iso_str = "2025-01-15T10:30:45Z"
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             occurred_at=iso_str,
         )
-        assert p.occurred_at == datetime(2025, 1, 15, 10, 30, 45)
+        assert p.occurred_at == _EXPECTED_DT
 
     def test_timezone_datetime_converted_to_utc(self):
         """Test timezone-aware datetime converted to UTC."""
         # Create datetime in +02:00 timezone
         dt_plus_2 = datetime(2025, 1, 15, 12, 30, 45, tzinfo=timezone(timedelta(hours=2)))
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             occurred_at=dt_plus_2,
         )
         # Should be converted to UTC (10:30:45)
-        assert p.occurred_at == datetime(2025, 1, 15, 10, 30, 45)
+        assert p.occurred_at == _EXPECTED_DT
 
-    def test_future_datetime_accepted(self):
+    def test_future_datetime_accepted(self, utc_now):
         """Test future datetime accepted."""
-        future = datetime.now(timezone.utc) + timedelta(days=1)
+        future = utc_now + timedelta(days=1)
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             occurred_at=future,
         )
-        assert p.occurred_at > datetime.now()
+        assert p.occurred_at > utc_now.replace(tzinfo=None)
 
 
 class TestPaymentJsonParsing:
@@ -175,80 +224,79 @@ class TestPaymentJsonParsing:
 
     def test_parse_valid_payment_json(self):
         """Test parsing valid payment JSON."""
-        json_str = '{"amount": "123.45", "currency": "USD", "occurred_at": "2025-01-15T10:30:45Z"}'
-        p = parse_payment_json(json_str)
+        p = parse_payment_json(_JSON_VALID)
         assert p.amount == Decimal("123.45")
         assert p.currency == "USD"
 
     def test_parse_json_with_float_string(self):
         """Test parsing JSON with float string (converted safely)."""
-        json_str = '{"amount": "99.99", "currency": "EUR", "occurred_at": "2025-01-15T10:30:45Z"}'
-        p = parse_payment_json(json_str)
+        p = parse_payment_json(_JSON_EUR)
         assert p.amount == Decimal("99.99")
 
+    def test_parse_json_numeric_amount_exact(self):
+        """Test JSON number amount keeps its exact decimal value."""
+        p = parse_payment_json(_JSON_NUMERIC)
+        assert p.amount == Decimal("0.10")
+
     def test_invalid_json(self):
         """NEGATIVE: Invalid JSON rejected."""
         with pytest.raises(Exception):  # json.JSONDecodeError
-            parse_payment_json('{"amount": invalid}')
+            parse_payment_json(_JSON_INVALID)
 
     def test_extra_fields_rejected(self):
         """NEGATIVE: Extra fields rejected (model_config forbid)."""
-        json_str = (
-            '{"amount": "100.00", "currency": "USD", '
-            '"occurred_at": "2025-01-15T10:30:45Z", "extra_field": "value"}'
-        )
         with pytest.raises(ValidationError) as exc_info:
-            parse_payment_json(json_str)
+            parse_payment_json(_JSON_EXTRA)
         assert "extra_field" in str(exc_info.value).lower()
 
 
 class TestPaymentBoundaryConditions:
     """Test boundary and edge cases."""
 
-    def test_min_amount_accepted(self):
+    def test_min_amount_accepted(self, utc_now):
         """Test minimum valid amount (0.01)."""
         p = Payment(
-            amount=Decimal("0.01"),
+            amount=_D_MIN,
             currency="USD",
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
-        assert p.amount == Decimal("0.01")
+        assert p.amount == _D_MIN
 
-    def test_max_amount_accepted(self):
+    def test_max_amount_accepted(self, utc_now):
         """Test maximum valid amount."""
         p = Payment(
-            amount=Decimal("999999999.99"),
+            amount=_D_MAX,
             currency="USD",
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
-        assert p.amount == Decimal("999999999.99")
+        assert p.amount == _D_MAX
 
-    def test_large_precision_decimal(self):
+    def test_large_precision_decimal(self, utc_now):
         """Test decimal with many decimal places (truncated)."""
         # Pydantic should validate decimal_places=2
         with pytest.raises(ValidationError):
             Payment(
                 amount=Decimal("100.123"),  # 3 decimal places
                 currency="USD",
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
 
-    def test_description_max_length(self):
+    def test_description_max_length(self, utc_now):
         """Test description length limit."""
         p = Payment(
-            amount=Decimal("100.00"),
+            amount=_D100,
             currency="USD",
             description="x" * 500,
-            occurred_at=datetime.now(timezone.utc),
+            occurred_at=utc_now,
         )
         assert len(p.description) == 500
 
-    def test_description_exceeds_max(self):
+    def test_description_exceeds_max(self, utc_now):
         """NEGATIVE: Description exceeding max length rejected."""
         with pytest.raises(ValidationError):
             Payment(
-                amount=Decimal("100.00"),
+                amount=_D100,
                 currency="USD",
                 description="x" * 501,
-                occurred_at=datetime.now(timezone.utc),
+                occurred_at=utc_now,
             )
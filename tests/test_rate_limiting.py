@@ -1,14 +1,43 @@
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.main import limiter as app_limiter
+from app.ratelimit import (
+    RateLimitMiddleware,
+    RouteLimiter,
+    SlidingWindowLimiter,
+    TokenBucketLimiter,
+    parse_rate,
+)
 
-client = TestClient(app)
 
+@pytest.fixture
+def low_limits(monkeypatch):
+    """Swap the app's limits for tiny ones so a 429 is reached in a few requests.
 
-def test_rate_limiting_health_endpoint():
-    """Test rate limiting on health endpoint"""
-    # Make a few requests to test the endpoint works
-    for i in range(5):
+    The app's middleware holds app_limiter itself, so its lookup and counting
+    are redirected to a fresh limiter; monkeypatch restores them afterwards.
+    """
+
+    def apply(limits):
+        low = SlidingWindowLimiter(limits)
+        monkeypatch.setattr(app_limiter, "rule_for", low.rule_for)
+        monkeypatch.setattr(app_limiter, "hit", low.hit)
+        return low
+
+    return apply
+
+
+class TestUnderLimit:
+    """Requests under a route's limit reach the endpoint normally.
+
+    Rejection is covered by test_rate_limiting_get_item_exhausted (the app with
+    lowered limits via low_limits) and by the limiter and middleware tests below.
+    """
+
+    def test_rate_limiting_health_endpoint(self, client):
+        """Test rate limiting on health endpoint"""
         response = client.get("/health")
         assert response.status_code == 200
         body = response.json()
@@ -16,66 +45,167 @@ def test_rate_limiting_health_endpoint():
         assert body["service"] == "task-tracker"
         assert "correlation_id" in body
 
-    # Note: Full rate limiting test would require many requests
-    # This is a basic functionality test
-
-
-def test_rate_limiting_create_item():
-    """Test rate limiting on create item endpoint"""
-    # Make a few requests to test the endpoint works
-    for i in range(3):
-        response = client.post("/items", json={"name": f"Task {i}"})
+    def test_rate_limiting_create_item(self, client):
+        """Test rate limiting on create item endpoint"""
+        response = client.post("/items", json={"name": "Task 0"})
         assert response.status_code == 201
-        assert "id" in response.json()
-        assert response.json()["name"] == f"Task {i}"
+        body = response.json()
+        assert "id" in body
+        assert body["name"] == "Task 0"
 
-    # Note: Full rate limiting test would require many requests
-    # This is a basic functionality test
+    def test_rate_limiting_get_item(self, client):
+        """Test rate limiting on get item endpoint"""
+        # First create an item
+        create_response = client.post("/items", json={"name": "Test Task"})
+        item_id = create_response.json()["id"]
 
+        response = client.get(f"/items/{item_id}")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["id"] == item_id
+        assert body["name"] == "Test Task"
+
+    def test_rate_limiting_different_endpoints(self, client):
+        """Test that rate limiting is per endpoint"""
+        # Test that both endpoints work
+        health_response = client.get("/health")
+        assert health_response.status_code == 200
+        body = health_response.json()
+        assert body["status"] == "ok"
+        assert body["service"] == "task-tracker"
 
-def test_rate_limiting_get_item():
-    """Test rate limiting on get item endpoint"""
-    # First create an item
-    create_response = client.post("/items", json={"name": "Test Task"})
-    item_id = create_response.json()["id"]
+        # Create item should also work
+        create_response = client.post("/items", json={"name": "Still Working"})
+        assert create_response.status_code == 201
+        assert "id" in create_response.json()
 
-    # Make a few requests to test the endpoint works
-    for i in range(3):
-        response = client.get(f"/items/{item_id}")
+    def test_rate_limiting_error_response(self, client):
+        """Test that rate limiting returns proper error response"""
+        # Test basic functionality
+        response = client.get("/health")
         assert response.status_code == 200
-        assert response.json()["id"] == item_id
-        assert response.json()["name"] == "Test Task"
+        body = response.json()
+        assert body["status"] == "ok"
+        assert body["service"] == "task-tracker"
 
-    # Note: Full rate limiting test would require many requests
-    # This is a basic functionality test
 
+def test_rate_limiting_get_item_exhausted(client, low_limits):
+    """NEGATIVE: The app answers 429 once a route's budget is spent"""
+    item_id = client.post("/items", json={"name": "Limited Task"}).json()["id"]
+    low_limits({("GET", "/items/{item_id}"): "2/minute"})
+
+    assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get(f"/items/{item_id}").status_code == 200
+    response = client.get(f"/items/{item_id}")
+    assert response.status_code == 429
+    assert response.headers["content-type"] == "application/problem+json"
+    assert int(response.headers["Retry-After"]) > 0
+    body = response.json()
+    assert body["detail"] == "Rate limit exceeded: 2/minute"
+    assert body["correlation_id"] == response.headers["X-Correlation-ID"]
 
-def test_rate_limiting_different_endpoints():
-    """Test that rate limiting is per endpoint"""
-    # Test that both endpoints work
-    health_response = client.get("/health")
-    assert health_response.status_code == 200
-    body = health_response.json()
-    assert body["status"] == "ok"
-    assert body["service"] == "task-tracker"
+    # Routes without a (lowered) limit are unaffected
+    assert client.get("/health").status_code == 200
 
-    # Create item should also work
-    create_response = client.post("/items", json={"name": "Still Working"})
-    assert create_response.status_code == 201
-    assert "id" in create_response.json()
 
-    # Note: Full rate limiting test would require many requests
-    # This is a basic functionality test
+def test_token_bucket_exhausted_after_capacity(monkeypatch):
+    """NEGATIVE: Requests beyond the bucket capacity are refused until it refills"""
+    monkeypatch.setattr("app.ratelimit.time.monotonic", lambda: 1000.0)
+    limiter = TokenBucketLimiter({("GET", "/ping"): "2/minute"})
+    rule = limiter.rule_for("GET", "/ping")
 
+    assert limiter.hit(rule, "10.0.0.1") == 0.0
+    assert limiter.hit(rule, "10.0.0.1") == 0.0
+    assert limiter.hit(rule, "10.0.0.1") == pytest.approx(30.0)  # 1 token per 30s
 
-def test_rate_limiting_error_response():
-    """Test that rate limiting returns proper error response"""
-    # Test basic functionality
-    response = client.get("/health")
-    assert response.status_code == 200
+    # Other clients have their own bucket
+    assert limiter.hit(rule, "10.0.0.2") == 0.0
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    """Test that tokens come back at the configured rate"""
+    now = [1000.0]
+    monkeypatch.setattr("app.ratelimit.time.monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter({("GET", "/ping"): "1/minute"})
+    rule = limiter.rule_for("GET", "/ping")
+
+    assert limiter.hit(rule, "client") == 0.0
+    assert limiter.hit(rule, "client") > 0
+    now[0] += 60.0
+    assert limiter.hit(rule, "client") == 0.0
+
+
+def test_sliding_window_no_boundary_burst(monkeypatch):
+    """NEGATIVE: A full budget can't be spent again just after a window edge"""
+    now = [1000.0]
+    monkeypatch.setattr("app.ratelimit.time.monotonic", lambda: now[0])
+    limiter = SlidingWindowLimiter({("GET", "/ping"): "2/minute"})
+    rule = limiter.rule_for("GET", "/ping")
+
+    assert limiter.hit(rule, "client") == 0.0  # t=0
+    now[0] += 59.0
+    assert limiter.hit(rule, "client") == 0.0  # t=59
+    now[0] += 1.5
+    assert limiter.hit(rule, "client") == 0.0  # t=60.5: first request has left the window
+    retry_after = limiter.hit(rule, "client")  # t=60.5: t=59 and t=60.5 still inside
+    assert retry_after == pytest.approx(58.5)
+
+    # Other clients are unaffected
+    assert limiter.hit(rule, "other") == 0.0
+
+
+def test_templated_routes_share_one_budget():
+    """NEGATIVE: Varying the path parameter doesn't give a fresh budget"""
+    limiter = SlidingWindowLimiter({("GET", "/items/{item_id}"): "1/minute"})
+    rule = limiter.rule_for("GET", "/items/1")
+
+    assert rule is limiter.rule_for("GET", "/items/2")
+    assert limiter.rule_for("DELETE", "/items/1") is None
+    assert limiter.rule_for("GET", "/items") is None
+    assert limiter.hit(rule, "client") == 0.0
+    assert limiter.hit(rule, "client") > 0
+
+
+def test_middleware_returns_rfc7807_429():
+    """NEGATIVE: Exhausted budget is answered with an RFC 7807 429 and Retry-After"""
+    mini = FastAPI()
+
+    @mini.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    mini.add_middleware(
+        RateLimitMiddleware, limiter=SlidingWindowLimiter({("GET", "/ping"): "1/minute"})
+    )
+    mini_client = TestClient(mini)
+
+    assert mini_client.get("/ping").status_code == 200
+    response = mini_client.get("/ping")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
     body = response.json()
-    assert body["status"] == "ok"
-    assert body["service"] == "task-tracker"
+    assert body["status"] == 429
+    assert body["type"] == "https://api.secdev.example.com/errors/rate_limit_exceeded"
+    assert body["title"] == "Rate Limit Exceeded"
+    assert body["instance"] == "/ping"
+    assert "correlation_id" in body
+
+
+@pytest.mark.parametrize("rate", ["", "10", "ten/minute", "0/minute", "5/fortnight"])
+def test_invalid_rate_string(rate):
+    """NEGATIVE: Malformed rate strings are rejected when the limiter builds its Rules"""
+    with pytest.raises(ValueError):
+        parse_rate(rate)
+    with pytest.raises(ValueError):
+        SlidingWindowLimiter({("GET", "/ping"): rate})
+
+
+def test_incomplete_limiter_fails_at_construction():
+    """NEGATIVE: A limiter missing hit()/_prune() can't be instantiated"""
+
+    class NoPrune(RouteLimiter):
+        def hit(self, rule, client):
+            return 0.0
 
-    # Note: Full rate limiting test would require many requests
-    # This is a basic functionality test
+    with pytest.raises(TypeError):
+        NoPrune({("GET", "/ping"): "1/minute"})